@@ -0,0 +1,119 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from real_estate_amortization import max_principal
+from real_estate_engine import INTEREST_RATES, LABELS_AR, LABELS_EN, LABELS_EN_SHORT, LOAN_YEARS
+from real_estate_import import CHUNK_SIZE, read_chunks
+
+BUDGET_COLUMNS = ["monthly_budget", "down_payment"]
+TERM_COLUMNS = ["interest_rate", "years"]
+AFFORDABILITY_COLUMNS = ["buyer", *BUDGET_COLUMNS, *TERM_COLUMNS, "max_loan", "max_price"]
+GRID_COLUMNS = ["buyer", *BUDGET_COLUMNS, *TERM_COLUMNS, "max_price"]
+# عدد المشترين في كل دفعة عند إخراج الشبكة كاملة (61 × 25 صفًا لكل مشترٍ)
+GRID_BATCH = 1000
+
+# قبول أسماء الأعمدة الداخلية أو المعروضة في أي نسخة، مثل ملفات العقارات
+BUDGET_ALIASES = {name: name for name in BUDGET_COLUMNS + TERM_COLUMNS}
+BUDGET_ALIASES.update({"Monthly Budget": "monthly_budget", "الميزانية الشهرية": "monthly_budget"})
+for labels in (LABELS_EN, LABELS_EN_SHORT, LABELS_AR):
+    BUDGET_ALIASES.update({labels[name]: name for name in ["down_payment", *TERM_COLUMNS]})
+
+
+@lru_cache(maxsize=None)
+def loan_table(method="flat"):
+    # لكل زوج (فائدة، مدة) تسمح به الواجهة (61 × 25): أكبر قرض يسدده قسط شهري قيمته 1
+    rates = np.asarray(INTEREST_RATES, dtype=np.float64)[:, None]
+    years = np.asarray(LOAN_YEARS, dtype=np.int64)[None, :]
+    table = max_principal(1.0, rates, years, method)
+    table.setflags(write=False)
+    return table
+
+
+def max_price(monthly_budget, down_payment, interest_rate, years, method="flat"):
+    # أعلى سعر ممكن لأي فائدة ومدة: الدفعة المقدمة + أكبر قرض تغطيه الميزانية الشهرية
+    return np.asarray(down_payment, dtype=np.float64) + max_principal(monthly_budget, interest_rate, years, method)
+
+
+def affordability_grid(monthly_budget, down_payment=0.0, method="flat"):
+    # الشبكة كاملة بعملية بث واحدة؛ مع مصفوفة ميزانيات يكون الشكل (عدد المشترين، 61، 25)
+    budget = np.asarray(monthly_budget, dtype=np.float64)[..., None, None]
+    down_payment = np.asarray(down_payment, dtype=np.float64)[..., None, None]
+    return down_payment + budget * loan_table(method)
+
+
+@lru_cache(maxsize=256)
+def affordability_frame(monthly_budget, down_payment, method="flat"):
+    index = pd.Index(INTEREST_RATES, name="interest_rate")
+    columns = pd.Index(LOAN_YEARS, name="years")
+    return pd.DataFrame(affordability_grid(monthly_budget, down_payment, method), index=index, columns=columns)
+
+
+def normalize_budgets(chunk):
+    # توحيد أسماء الأعمدة وأنواع البيانات؛ الفائدة والمدة اختياريتان معًا
+    chunk = chunk.rename(columns=lambda column: BUDGET_ALIASES.get(str(column).strip(), column))
+    if "down_payment" not in chunk.columns:
+        chunk["down_payment"] = 0.0
+    if "monthly_budget" not in chunk.columns:
+        raise ValueError("Missing columns: monthly_budget")
+    terms = [name for name in TERM_COLUMNS if name in chunk.columns]
+    if len(terms) == 1:
+        raise ValueError(f"Missing columns: {', '.join(set(TERM_COLUMNS) - set(terms))}")
+
+    chunk = chunk[BUDGET_COLUMNS + terms].copy()
+    for name in chunk.columns:
+        chunk[name] = pd.to_numeric(chunk[name], errors="coerce")
+    return chunk
+
+
+def validate_budgets(chunk):
+    # استبعاد الصفوف الناقصة أو السالبة، والفائدة السالبة (قرض لا نهائي)، والمدد الكسرية أو الأقل من سنة
+    valid = (
+        chunk.notna().all(axis=1).to_numpy()
+        & (chunk["monthly_budget"].to_numpy() >= 0)
+        & (chunk["down_payment"].to_numpy() >= 0)
+    )
+    if "years" in chunk.columns:
+        years = chunk["years"].to_numpy()
+        valid = valid & (years >= 1) & (np.mod(years, 1) == 0) & (chunk["interest_rate"].to_numpy() >= 0)
+    return chunk[valid], int(np.count_nonzero(~valid))
+
+
+def affordability_batch(budgets, method="flat"):
+    # مع عمودي الفائدة والمدة: صف لكل مشترٍ بأعلى سعر ممكن بشروطه
+    # ودونهما: الشبكة كاملة لكل مشترٍ بصيغة طويلة (مشترٍ، فائدة، مدة، أعلى سعر)
+    budget = budgets["monthly_budget"].to_numpy(dtype=np.float64)
+    down_payment = budgets["down_payment"].to_numpy(dtype=np.float64)
+    if "years" in budgets.columns:
+        interest_rate = budgets["interest_rate"].to_numpy(dtype=np.float64)
+        years = budgets["years"].to_numpy(dtype=np.int64)
+        loan = max_principal(budget, interest_rate, years, method)
+        values = [budgets.index.to_numpy(), budget, down_payment, interest_rate, years, loan, down_payment + loan]
+        return pd.DataFrame(dict(zip(AFFORDABILITY_COLUMNS, values)))
+
+    cells = len(INTEREST_RATES) * len(LOAN_YEARS)
+    rates, years = np.meshgrid(INTEREST_RATES, LOAN_YEARS, indexing="ij")
+    values = [
+        np.repeat(budgets.index.to_numpy(), cells),
+        np.repeat(budget, cells),
+        np.repeat(down_payment, cells),
+        np.tile(rates.ravel(), len(budgets)),
+        np.tile(years.ravel(), len(budgets)),
+        affordability_grid(budget, down_payment, method).ravel(),
+    ]
+    return pd.DataFrame(dict(zip(GRID_COLUMNS, values)))
+
+
+def affordability_chunks(source, file_name=None, method="flat", chunk_size=CHUNK_SIZE):
+    # لكل دفعة: النتائج، عدد الصفوف المرفوضة، ونسبة التقدم؛ المشترون مرقمون من 1 بترتيب الملف
+    start = 1
+    for chunk, progress in read_chunks(source, file_name, chunk_size):
+        size = len(chunk)
+        chunk.index = pd.RangeIndex(start, start + size)
+        start += size
+        valid, rejected = validate_budgets(normalize_budgets(chunk))
+        step = max(len(valid), 1) if "years" in valid.columns else GRID_BATCH
+        for offset in range(0, max(len(valid), 1), step):
+            yield affordability_batch(valid.iloc[offset:offset + step], method), rejected, progress
+            rejected = 0
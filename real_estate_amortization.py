@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+METHODS = ["flat", "annuity"]
+SCHEDULE_COLUMNS = ["month", "payment", "principal", "interest", "balance"]
+
+
+def _loan_arrays(principal, interest_rate, years):
+    principal = np.atleast_1d(np.asarray(principal, dtype=np.float64))
+    interest_rate = np.atleast_1d(np.asarray(interest_rate, dtype=np.float64))
+    months = np.atleast_1d(np.asarray(years, dtype=np.int64)) * 12
+    return principal, interest_rate, months
+
+
+def _payment(principal, interest_rate, months, method):
+    if method == "flat":
+        return (principal + principal * (interest_rate / 100) * (months / 12)) / months
+    if method != "annuity":
+        raise ValueError(f"Unknown amortization method: {method}")
+    rate = interest_rate / 1200
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = principal * rate / (1 - (1 + rate) ** -months)
+    return np.where(rate > 0, payment, principal / months)
+
+
+def monthly_payment(principal, interest_rate, years, method="flat"):
+    # القسط الشهري بطريقة الفائدة الثابتة أو بطريقة الرصيد المتناقص (annuity)
+    return _payment(*_loan_arrays(principal, interest_rate, years), method)
+
+
+def max_principal(payment, interest_rate, years, method="flat"):
+    # عكس القسط الشهري بصيغة مغلقة: أكبر قرض يسدده قسط معين بالطريقة نفسها
+    payment, interest_rate, months = _loan_arrays(payment, interest_rate, years)
+    if method == "flat":
+        return payment * months / (1 + (interest_rate / 100) * (months / 12))
+    if method != "annuity":
+        raise ValueError(f"Unknown amortization method: {method}")
+    rate = interest_rate / 1200
+    with np.errstate(divide="ignore", invalid="ignore"):
+        principal = payment * (1 - (1 + rate) ** -months) / rate
+    return np.where(rate > 0, principal, payment * months)
+
+
+def total_interest(principal, interest_rate, years, method="flat"):
+    principal, interest_rate, months = _loan_arrays(principal, interest_rate, years)
+    return _payment(principal, interest_rate, months, method) * months - principal
+
+
+def schedule(principal, interest_rate, years, method="flat"):
+    # جدول السداد الشهري لعدة قروض دفعة واحدة: مصفوفات بشكل (عدد القروض، أطول مدة بالأشهر)
+    # الأشهر تغطي المدة كاملة لكل قرض مهما طالت، فيصل الرصيد إلى الصفر في آخر صف
+    principal, interest_rate, months = _loan_arrays(principal, interest_rate, years)
+    payment = _payment(principal, interest_rate, months, method)[:, None]
+    loan = principal[:, None]
+    term = months[:, None]
+    month = np.arange(1, int(months.max(initial=1)) + 1)[None, :]
+    active = month <= term
+
+    if method == "flat":
+        principal_paid = np.broadcast_to(loan / term, active.shape)
+        interest = np.broadcast_to(payment - loan / term, active.shape)
+        balance = loan - principal_paid * month
+    else:
+        rate = (interest_rate / 1200)[:, None]
+        growth = (1 + rate) ** month
+        safe_rate = np.where(rate > 0, rate, 1.0)
+        balance = np.where(rate > 0, loan * growth - payment * (growth - 1) / safe_rate, loan - payment * month)
+        previous = (balance + payment) / (1 + rate)
+        interest = previous * rate
+        principal_paid = payment - interest
+
+    return {
+        "month": month[0],
+        "payment": np.where(active, payment, 0.0),
+        "principal": np.where(active, principal_paid, 0.0),
+        "interest": np.where(active, interest, 0.0),
+        "balance": np.where(active, np.maximum(balance, 0.0), 0.0),
+    }
+
+
+def schedule_frame(principal, interest_rate, years, method="flat", labels=None):
+    # جدول سداد عقار واحد كـ DataFrame للعرض أو التصدير
+    result = schedule(principal, interest_rate, years, method)
+    term = int(np.atleast_1d(years)[0]) * 12
+    labels = labels or {}
+    data = {labels.get(name, name): values[0, :term] if values.ndim == 2 else values[:term] for name, values in result.items()}
+    return pd.DataFrame(data)
@@ -0,0 +1,188 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from real_estate_engine import (
+    COLUMNS, INTEREST_RATES, LABELS_AR, LABELS_EN, LABELS_EN_SHORT, LOAN_YEARS, calculate, calculate_frame,
+)
+from real_estate_pdf import ARABIC_REPORT, LANDSCAPE_REPORT, PORTRAIT_REPORT, render_pdf
+from real_estate_store import RecordStore
+
+SIZES = [10, 1_000, 100_000, 1_000_000]
+PROPERTY_TYPES = ["Apartment", "House", "Villa"]
+PROPERTY_TYPES_AR = ["شقة", "بيت", "فيلا"]
+SEED = 20240101
+REPEAT = 3
+MIN_ROUND_SECONDS = 0.05
+THRESHOLD = 0.25
+NOISE_SECONDS = 0.002
+
+# أكبر حجم يُقاس افتراضيًا لكل حالة بطيئة؛ --full يلغي هذه الحدود
+ROW_LIMITS = {
+    "store_append": 10_000,
+    "styler": 10_000,
+    "pdf_portrait": 100_000,
+    "pdf_landscape": 100_000,
+    "pdf_arabic": 100_000,
+}
+
+
+def synthetic_portfolio(rows, seed=SEED):
+    # محفظة عشوائية ثابتة البذرة حتى تكون القياسات قابلة للتكرار
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(100_000, 5_000_000, rows).round(-3)
+    return pd.DataFrame({
+        "property_type": rng.choice(PROPERTY_TYPES, rows),
+        "price": price,
+        "down_payment": (price * rng.uniform(0, 0.5, rows)).round(-3),
+        "interest_rate": rng.choice(INTEREST_RATES, rows),
+        "years": rng.choice(LOAN_YEARS, rows),
+        "rental_percent": rng.choice(np.arange(1.0, 10.5, 0.5), rows),
+    })
+
+
+def _filled_store(computed):
+    store = RecordStore(PROPERTY_TYPES, capacity=len(computed))
+    store.extend(computed)
+    return store
+
+
+def _calculate(inputs, computed):
+    columns = [inputs[name].to_numpy() for name in ("price", "down_payment", "interest_rate", "years", "rental_percent")]
+    return lambda: calculate(*columns)
+
+
+def _store_append(inputs, computed):
+    # المسار الذي يمر به نموذج الإدخال: عقار واحد في كل مرة
+    rows = list(inputs.itertuples(index=False, name=None))
+
+    def run():
+        store = RecordStore(PROPERTY_TYPES)
+        for row in rows:
+            store.append(*row)
+    return run
+
+
+def _frame_build(inputs, computed):
+    return lambda: _filled_store(computed).frame(LABELS_EN)
+
+
+def _styler(inputs, computed):
+    frame = _filled_store(computed).frame(LABELS_EN)
+    return lambda: frame.style.format(precision=2).to_html()
+
+
+def _pdf(settings, labels, property_types=None):
+    def case(inputs, computed):
+        frame = _filled_store(computed).frame(labels)
+        if property_types:
+            # أنواع عقار عربية حتى يشمل القياس تشكيل النص في كل صف
+            column = labels["property_type"]
+            frame[column] = frame[column].cat.rename_categories(property_types)
+        return lambda: render_pdf(frame, settings)
+    return case
+
+
+CASES = {
+    "calculate": _calculate,
+    "store_append": _store_append,
+    "frame_build": _frame_build,
+    "styler": _styler,
+    "pdf_portrait": _pdf(PORTRAIT_REPORT, LABELS_EN),
+    "pdf_landscape": _pdf(LANDSCAPE_REPORT, LABELS_EN_SHORT),
+    "pdf_arabic": _pdf(ARABIC_REPORT, LABELS_AR, PROPERTY_TYPES_AR),
+}
+
+
+def measure(function, repeat=REPEAT):
+    # مثل timeit: تكرار الدالة السريعة داخل كل جولة، وأخذ أفضل جولة لتقليل الضجيج
+    start = time.perf_counter()
+    function()
+    first = time.perf_counter() - start
+    number = max(1, int(MIN_ROUND_SECONDS / max(first, 1e-9)))
+    best = first
+    for _ in range(repeat - 1 if number == 1 else repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_benchmarks(sizes=SIZES, cases=None, repeat=REPEAT, full=False, seed=SEED, log=None):
+    results = []
+    for rows in sizes:
+        inputs = synthetic_portfolio(rows, seed)
+        computed = calculate_frame(inputs)[COLUMNS]
+        for name in cases or CASES:
+            if not full and rows > ROW_LIMITS.get(name, rows):
+                continue
+            seconds = measure(CASES[name](inputs, computed), repeat)
+            result = {"case": name, "rows": rows, "seconds": seconds, "rows_per_second": rows / seconds}
+            results.append(result)
+            if log is not None:
+                print(f"{name:<14} {rows:>10,} rows  {seconds:10.4f}s  {rows / seconds:>14,.0f} rows/s", file=log)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    # مقارنة كل حالة بنظيرتها في خط الأساس؛ الفروق الأصغر من NOISE_SECONDS لا تعد تراجعًا
+    previous = {(item["case"], item["rows"]): item["seconds"] for item in baseline["results"]}
+    report = []
+    for item in current["results"]:
+        before = previous.get((item["case"], item["rows"]))
+        if before is None:
+            continue
+        ratio = item["seconds"] / before
+        regressed = ratio > 1 + threshold and item["seconds"] - before > NOISE_SECONDS
+        report.append({**item, "baseline_seconds": before, "ratio": ratio, "regressed": regressed})
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark calculation, table building and PDF export.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="portfolio sizes in rows")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=None)
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timing rounds per case (best is kept)")
+    parser.add_argument("--full", action="store_true", help="also run slow cases at sizes above their row limit")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown before a case counts as a regression (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args.sizes, args.cases, args.repeat, args.full, args.seed, log=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as source:
+        report = compare(results, json.load(source), args.threshold)
+    for item in report:
+        flag = "REGRESSION" if item["regressed"] else "ok"
+        print(f"{item['case']:<14} {item['rows']:>10,} rows  x{item['ratio']:.2f}  {flag}", file=sys.stderr)
+    return 1 if any(item["regressed"] for item in report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
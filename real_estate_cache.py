@@ -0,0 +1,71 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+MAX_BYTES = 256 * 1024 * 1024
+MAX_ENTRIES = 64
+
+
+def report_key(dataframe, settings):
+    # مفتاح يعتمد على محتوى الجدول وإعدادات التصدير فقط
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr(sorted(settings.items())).encode())
+    digest.update(repr([str(col) for col in dataframe.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(dataframe, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ReportCache:
+    # ذاكرة LRU محدودة الحجم للتقارير الجاهزة، مشتركة بين جلسات نفس العملية
+    def __init__(self, max_bytes=MAX_BYTES, max_entries=MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size_bytes -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self.size_bytes += len(data)
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.size_bytes,
+            }
+
+
+report_cache = ReportCache()
@@ -1,11 +1,35 @@
 
 import streamlit as st
-import pandas as pd
-from fpdf import FPDF
-import os
+from real_estate_engine import INTEREST_RATES, LABELS_AR, LABELS_EN
+from real_estate_pdf import ARABIC_REPORT
+from real_estate_reports import UNICODE_DETAIL_REPORT
+from real_estate_store import open_store
+from real_estate_ui import (
+    affordability_view,
+    amortization_view,
+    data_export,
+    detail_reports,
+    duplicate_warning,
+    edit_records,
+    import_properties,
+    metrics_panel,
+    pdf_export_status,
+    portfolio_optimizer,
+    portfolio_summary,
+    property_table,
+    sensitivity_view,
+    simulation_view,
+    start_metrics,
+    start_pdf_export,
+    what_if_preview,
+)
 
 st.set_page_config(page_title="حاسبة شراء العقار", layout="wide")
 
+metrics = start_metrics()
+
+PROPERTY_TYPES = ["شقة", "بيت", "فيلا"]
+
 st.markdown(""" 
     <style>
         .stDataFrameContainer {
@@ -18,17 +42,17 @@ st.title("🏠 حاسبة شراء العقار")
 
 # جدول لتخزين البيانات في الجلسة
 if "records" not in st.session_state:
-    st.session_state.records = []
+    st.session_state.records = open_store(PROPERTY_TYPES)
 
 # إدخال بيانات العقار
 with st.form("add_property_form"):
     st.subheader("🔢 إدخال بيانات العقار")
 
-    property_type = st.selectbox("نوع العقار", ["شقة", "بيت", "فيلا"])
+    property_type = st.selectbox("نوع العقار", PROPERTY_TYPES)
     price = st.number_input("سعر العقار", min_value=10000.0, step=1000.0)
 
     down_payment = st.number_input("الدفعة المقدمة", min_value=0.0, step=1000.0)
-    interest_rate = st.selectbox("نسبة الفائدة السنوية (%)", [round(i, 1) for i in [x * 0.1 for x in range(10, 71)]])
+    interest_rate = st.selectbox("نسبة الفائدة السنوية (%)", INTEREST_RATES)
     years = st.slider("مدة التمويل (عدد السنوات)", min_value=1, max_value=25, step=1)
     rental_percent = st.number_input("نسبة الإيجار السنوية (%)", min_value=0.0, max_value=100.0, value=5.0, step=0.1)
 
@@ -37,72 +61,32 @@ with st.form("add_property_form"):
     if submitted:
         if down_payment > price:
             st.error("🚫 الدفعة المقدمة لا يمكن أن تتجاوز سعر العقار.")
-        else:
-            original_value = price - down_payment
-            total_interest = original_value * (interest_rate / 100) * years
-            total_amount = original_value + total_interest
-            monthly_payment = total_amount / (years * 12)
-            rental_value = original_value * (rental_percent / 100)
-
-            st.session_state.records.append({
-                "Property Type": property_type,
-                "Price": price,
-                "Down Payment": down_payment,
-                "Net Property Value": original_value,
-                "Annual Interest Rate (%)": interest_rate,
-                "Years": years,
-                "Total Interest": total_interest,
-                "Total With Interest": total_amount,
-                "Monthly Payment": monthly_payment,
-                f"Annual Rent ({rental_percent}%)": rental_value
-            })
+        elif not duplicate_warning("ar", property_type, price, down_payment, interest_rate, years, rental_percent):
+            st.session_state.records.append(property_type, price, down_payment, interest_rate, years, rental_percent)
             st.success("✅ تم إضافة العقار إلى الجدول.")
 
+metrics.mark("form")
+what_if_preview(PROPERTY_TYPES, LABELS_EN, "ar")
+affordability_view(LABELS_EN, "ar")
+import_properties("ar")
+
 # عرض الجدول
 st.markdown("### 📋 جدول العقارات")
 if st.session_state.records:
-    df = pd.DataFrame(st.session_state.records)
-    st.dataframe(df.style.format(precision=2), use_container_width=True, height=500)
-
-    # زر تصدير إلى PDF
+    portfolio_summary("ar")
+    property_table(LABELS_EN, "ar", height=500)
+    data_export(LABELS_EN, "ar")
+    edit_records(LABELS_EN, "ar")
+    amortization_view("ar")
+    sensitivity_view("ar")
+    simulation_view("ar")
+    portfolio_optimizer(LABELS_EN, "ar")
+
+    # زر تصدير إلى PDF بخط عربي ومن اليمين لليسار
     if st.button("📄 تصدير إلى PDF"):
-        class PDF(FPDF):
-            def header(self):
-                self.set_font("Arial", 'B', 14)
-                self.cell(0, 10, "Real Estate Purchase Summary", ln=True, align='C')
-                self.ln(5)
-
-            def table(self, dataframe):
-                self.set_font("Arial", '', 9)
-                col_width = self.w / (len(dataframe.columns) + 1)
-                row_height = 6
-
-                # Header
-                self.set_fill_color(230, 230, 250)
-                for col in dataframe.columns:
-                    self.cell(col_width, row_height, str(col), border=1, fill=True)
-                self.ln(row_height)
-
-                # Rows
-                for _, row in dataframe.iterrows():
-                    for item in row:
-                        self.cell(col_width, row_height, str(round(item, 2)) if isinstance(item, (int, float)) else str(item), border=1)
-                    self.ln(row_height)
-
-        pdf = PDF()
-        pdf.add_page()
-        pdf.table(df)
-
-        output_path = "real_estate_report.pdf"
-        pdf.output(output_path)
-        with open(output_path, "rb") as file:
-            st.download_button(
-                label="📥 تحميل ملف PDF",
-                data=file,
-                file_name="real_estate_report.pdf",
-                mime="application/pdf"
-            )
-        os.remove(output_path)
+        start_pdf_export(st.session_state.records.frame(LABELS_AR), ARABIC_REPORT)
+    pdf_export_status("ar", "real_estate_report.pdf")
+    detail_reports(LABELS_EN, "ar", UNICODE_DETAIL_REPORT)
 else:
     st.info("لم يتم إضافة أي عقار بعد.")
 
@@ -111,3 +95,5 @@ if st.session_state.records:
     if st.button("🗑️ مسح جميع العقارات"):
         st.session_state.records.clear()
         st.success("✅ تم مسح الجدول.")
+
+metrics_panel("ar")
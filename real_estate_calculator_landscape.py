@@ -1,23 +1,46 @@
 
 import streamlit as st
-import pandas as pd
-from fpdf import FPDF
-import os
+from real_estate_engine import INTEREST_RATES, LABELS_EN_SHORT
+from real_estate_pdf import LANDSCAPE_REPORT
+from real_estate_store import open_store
+from real_estate_ui import (
+    affordability_view,
+    amortization_view,
+    data_export,
+    detail_reports,
+    duplicate_warning,
+    edit_records,
+    import_properties,
+    metrics_panel,
+    pdf_export_status,
+    portfolio_optimizer,
+    portfolio_summary,
+    property_table,
+    sensitivity_view,
+    simulation_view,
+    start_metrics,
+    start_pdf_export,
+    what_if_preview,
+)
 
 st.set_page_config(page_title="Real Estate Calculator", layout="wide")
 
+metrics = start_metrics()
+
+PROPERTY_TYPES = ["Apartment", "House", "Villa"]
+
 st.title("🏠 Real Estate Purchase Calculator")
 
 if "records" not in st.session_state:
-    st.session_state.records = []
+    st.session_state.records = open_store(PROPERTY_TYPES)
 
 with st.form("add_property_form"):
     st.subheader("📋 Enter Property Details")
 
-    property_type = st.selectbox("Property Type", ["Apartment", "House", "Villa"])
+    property_type = st.selectbox("Property Type", PROPERTY_TYPES)
     price = st.number_input("Property Price", min_value=10000.0, step=1000.0)
     down_payment = st.number_input("Down Payment", min_value=0.0, step=1000.0)
-    interest_rate = st.selectbox("Annual Interest Rate (%)", [round(i, 1) for i in [x * 0.1 for x in range(10, 71)]])
+    interest_rate = st.selectbox("Annual Interest Rate (%)", INTEREST_RATES)
     years = st.slider("Loan Duration (Years)", min_value=1, max_value=25, step=1)
     rental_percent = st.number_input("Annual Rent Percentage (%)", min_value=0.0, max_value=100.0, value=5.0, step=0.1)
 
@@ -26,71 +49,36 @@ with st.form("add_property_form"):
     if submitted:
         if down_payment > price:
             st.error("Down payment cannot exceed property price.")
-        else:
-            net_value = price - down_payment
-            total_interest = net_value * (interest_rate / 100) * years
-            total_with_interest = net_value + total_interest
-            monthly_payment = total_with_interest / (years * 12)
-            rent_value = net_value * (rental_percent / 100)
-
-            st.session_state.records.append({
-                "Property Type": property_type,
-                "Price": price,
-                "Down Payment": down_payment,
-                "Net Value": net_value,
-                "Interest Rate (%)": interest_rate,
-                "Years": years,
-                "Total Interest": total_interest,
-                "Total w/ Interest": total_with_interest,
-                "Monthly Payment": monthly_payment,
-                f"Annual Rent ({rental_percent}%)": rent_value
-            })
+        elif not duplicate_warning("en", property_type, price, down_payment, interest_rate, years, rental_percent):
+            st.session_state.records.append(property_type, price, down_payment, interest_rate, years, rental_percent)
             st.success("Property added successfully.")
 
+metrics.mark("form")
+what_if_preview(PROPERTY_TYPES, LABELS_EN_SHORT, "en")
+affordability_view(LABELS_EN_SHORT, "en")
+import_properties("en")
+
 st.markdown("### 📊 Properties Summary")
 if st.session_state.records:
-    df = pd.DataFrame(st.session_state.records)
-    st.dataframe(df.style.format(precision=2), use_container_width=True)
+    df = st.session_state.records.frame(LABELS_EN_SHORT)
+    portfolio_summary("en")
+    property_table(LABELS_EN_SHORT, "en")
+    data_export(LABELS_EN_SHORT, "en")
+    edit_records(LABELS_EN_SHORT, "en")
+    amortization_view("en")
+    sensitivity_view("en")
+    simulation_view("en")
+    portfolio_optimizer(LABELS_EN_SHORT, "en")
 
     if st.button("📄 Export to PDF"):
-        class PDF(FPDF):
-            def __init__(self):
-                super().__init__(orientation='L', unit='mm', format='A4')
-
-            def header(self):
-                self.set_font("Helvetica", 'B', 12)
-                self.cell(0, 10, "Real Estate Summary", ln=True, align='C')
-                self.ln(5)
-
-            def table(self, dataframe):
-                self.set_font("Helvetica", '', 9)
-                col_width = self.w / (len(dataframe.columns) + 1)
-                row_height = 6
-                self.set_fill_color(200, 230, 255)
-
-                for col in dataframe.columns:
-                    self.cell(col_width, row_height, str(col), border=1, fill=True)
-                self.ln(row_height)
-
-                for _, row in dataframe.iterrows():
-                    for item in row:
-                        text = f"{item:,.2f}" if isinstance(item, float) else str(item)
-                        self.cell(col_width, row_height, text, border=1)
-                    self.ln(row_height)
-
-        pdf = PDF()
-        pdf.add_page()
-        pdf.table(df)
-
-        file_path = "real_estate_summary_landscape.pdf"
-        pdf.output(file_path)
-
-        with open(file_path, "rb") as f:
-            st.download_button("📥 Download PDF", f, file_name="real_estate_summary.pdf", mime="application/pdf")
-        os.remove(file_path)
+        start_pdf_export(df, LANDSCAPE_REPORT)
+    pdf_export_status("en", "real_estate_summary.pdf")
+    detail_reports(LABELS_EN_SHORT, "en")
 
     if st.button("🗑️ Clear All"):
         st.session_state.records.clear()
         st.success("All records cleared.")
 else:
     st.info("No properties added yet.")
+
+metrics_panel("en")
@@ -1,9 +1,33 @@
 
 import streamlit as st
-import pandas as pd
+from real_estate_engine import INTEREST_RATES, LABELS_AR
+from real_estate_pdf import ARABIC_REPORT
+from real_estate_store import open_store
+from real_estate_ui import (
+    affordability_view,
+    amortization_view,
+    data_export,
+    duplicate_warning,
+    edit_records,
+    import_properties,
+    metrics_panel,
+    pdf_export_status,
+    portfolio_optimizer,
+    portfolio_summary,
+    property_table,
+    sensitivity_view,
+    simulation_view,
+    start_metrics,
+    start_pdf_export,
+    what_if_preview,
+)
 
 st.set_page_config(page_title="حاسبة شراء العقار", layout="wide")
 
+metrics = start_metrics()
+
+PROPERTY_TYPES = ["شقة", "بيت", "فيلا"]
+
 st.markdown(""" 
     <style>
         .stDataFrameContainer {
@@ -16,17 +40,17 @@ st.title("🏠 حاسبة شراء العقار")
 
 # جدول لتخزين البيانات في الجلسة
 if "records" not in st.session_state:
-    st.session_state.records = []
+    st.session_state.records = open_store(PROPERTY_TYPES)
 
 # إدخال بيانات العقار
 with st.form("add_property_form"):
     st.subheader("🔢 إدخال بيانات العقار")
 
-    property_type = st.selectbox("نوع العقار", ["شقة", "بيت", "فيلا"])
+    property_type = st.selectbox("نوع العقار", PROPERTY_TYPES)
     price = st.number_input("سعر العقار", min_value=10000.0, step=1000.0)
 
     down_payment = st.number_input("الدفعة المقدمة", min_value=0.0, step=1000.0)
-    interest_rate = st.selectbox("نسبة الفائدة السنوية (%)", [round(i, 1) for i in [x * 0.1 for x in range(10, 71)]])
+    interest_rate = st.selectbox("نسبة الفائدة السنوية (%)", INTEREST_RATES)
     years = st.slider("مدة التمويل (عدد السنوات)", min_value=1, max_value=25, step=1)
     rental_percent = st.number_input("نسبة الإيجار السنوية (%)", min_value=0.0, max_value=100.0, value=5.0, step=0.1)
 
@@ -35,32 +59,31 @@ with st.form("add_property_form"):
     if submitted:
         if down_payment > price:
             st.error("🚫 الدفعة المقدمة لا يمكن أن تتجاوز سعر العقار.")
-        else:
-            original_value = price - down_payment
-            total_interest = original_value * (interest_rate / 100) * years
-            total_amount = original_value + total_interest
-            monthly_payment = total_amount / (years * 12)
-            rental_value = original_value * (rental_percent / 100)
-
-            st.session_state.records.append({
-                "نوع العقار": property_type,
-                "سعر العقار": price,
-                "الدفعة المقدمة": down_payment,
-                "قيمة العقار الأصلي": original_value,
-                "نسبة الفائدة السنوية": interest_rate,
-                "عدد السنوات": years,
-                "إجمالي الفوائد": total_interest,
-                "الإجمالي مع الفوائد": total_amount,
-                "القسط الشهري": monthly_payment,
-                f"قيمة الإيجار ({rental_percent}%)": rental_value
-            })
+        elif not duplicate_warning("ar", property_type, price, down_payment, interest_rate, years, rental_percent):
+            st.session_state.records.append(property_type, price, down_payment, interest_rate, years, rental_percent)
             st.success("✅ تم إضافة العقار إلى الجدول.")
 
+metrics.mark("form")
+what_if_preview(PROPERTY_TYPES, LABELS_AR, "ar")
+affordability_view(LABELS_AR, "ar")
+import_properties("ar")
+
 # عرض الجدول من اليمين لليسار
 st.markdown("### 📋 جدول العقارات")
 if st.session_state.records:
-    df = pd.DataFrame(st.session_state.records)
-    st.dataframe(df.style.format(precision=2), use_container_width=True, height=500)
+    portfolio_summary("ar")
+    property_table(LABELS_AR, "ar", height=500)
+    data_export(LABELS_AR, "ar")
+    edit_records(LABELS_AR, "ar")
+    amortization_view("ar")
+    sensitivity_view("ar")
+    simulation_view("ar")
+    portfolio_optimizer(LABELS_AR, "ar")
+
+    # زر تصدير إلى PDF بخط عربي ومن اليمين لليسار
+    if st.button("📄 تصدير إلى PDF"):
+        start_pdf_export(st.session_state.records.frame(LABELS_AR), ARABIC_REPORT)
+    pdf_export_status("ar", "real_estate_report.pdf")
 else:
     st.info("لم يتم إضافة أي عقار بعد.")
 
@@ -69,3 +92,5 @@ if st.session_state.records:
     if st.button("🗑️ مسح جميع العقارات"):
         st.session_state.records.clear()
         st.success("✅ تم مسح الجدول.")
+
+metrics_panel("ar")
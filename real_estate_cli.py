@@ -0,0 +1,186 @@
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import os
+import sys
+
+FORMATS = ["csv", "xlsx", "parquet", "pdf"]
+LABEL_SETS = ["internal", "en", "en_short", "ar"]
+REPORTS = ["portrait", "landscape", "compact", "arabic"]
+DETAIL_FORMATS = ["pdf", "zip"]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Price a file of properties without Streamlit and write CSV, XLSX, Parquet or PDF output."
+    )
+    parser.add_argument("input", help="CSV, XLSX or Parquet file with the property inputs (or buyer budgets)")
+    parser.add_argument("-o", "--output", action="append", required=True,
+                        help="output file; the format comes from the extension (repeatable)")
+    parser.add_argument("--labels", choices=LABEL_SETS, default="internal", help="column names to write")
+    parser.add_argument("--report", choices=REPORTS, default="landscape", help="PDF layout")
+    parser.add_argument("--details", help="also write a detail page per property to a merged .pdf or a .zip of PDFs")
+    parser.add_argument("--budgets", action="store_true",
+                        help="input is buyer budgets (monthly_budget, down_payment, optional interest_rate and "
+                             "years); write the maximum affordable price, or the full rate x years grid per buyer")
+    parser.add_argument("--method", choices=["flat", "annuity"], default="flat",
+                        help="amortization method for the yearly schedule on detail pages and for --budgets")
+    parser.add_argument("--workers", type=int, default=None, help="processes that render detail pages")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows per chunk")
+    parser.add_argument("--timings", action="store_true", help="print startup and throughput timings to stderr")
+    return parser.parse_args(argv)
+
+
+def _output_format(path, formats=FORMATS):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension not in formats:
+        raise SystemExit(f"Unsupported output format: {path}")
+    return extension
+
+
+def _labels(name):
+    import real_estate_engine
+
+    return {
+        "internal": {},
+        "en": real_estate_engine.LABELS_EN,
+        "en_short": real_estate_engine.LABELS_EN_SHORT,
+        "ar": real_estate_engine.LABELS_AR,
+    }[name]
+
+
+def _report(name):
+    import real_estate_pdf
+
+    return {
+        "portrait": real_estate_pdf.PORTRAIT_REPORT,
+        "landscape": real_estate_pdf.LANDSCAPE_REPORT,
+        "compact": real_estate_pdf.LANDSCAPE_COMPACT_REPORT,
+        "arabic": real_estate_pdf.ARABIC_REPORT,
+    }[name]
+
+
+def _numbered_chunks(args):
+    # قراءة ثانية للملف على دفعات لصفحات التفاصيل، مع ترقيم العقارات من 1 كما في الواجهة
+    from real_estate_import import CHUNK_SIZE, import_chunks
+
+    start = 1
+    for frame, _, _ in import_chunks(args.input, chunk_size=args.chunk_size or CHUNK_SIZE):
+        frame.index += start
+        start += len(frame)
+        yield frame
+
+
+def run_budgets(args):
+    # عكس الحساب لملف ميزانيات المشترين: أعلى سعر ممكن لكل مشترٍ، يُكتب على دفعات مثل ملفات العقارات
+    from real_estate_affordability import affordability_chunks
+    from real_estate_export import COMPRESSIONS, WRITERS
+    from real_estate_import import CHUNK_SIZE
+
+    outputs = [(path, _output_format(path, list(WRITERS))) for path in args.output]
+    labels = _labels(args.labels)
+    ready = time.perf_counter()
+
+    writers = [WRITERS[fmt](path, COMPRESSIONS[fmt][0]) for path, fmt in outputs]
+    rows = rejected = 0
+    for frame, bad_rows, _ in affordability_chunks(args.input, method=args.method,
+                                                   chunk_size=args.chunk_size or CHUNK_SIZE):
+        frame = frame.rename(columns=labels)
+        for writer in writers:
+            writer.write(frame)
+        rows += len(frame)
+        rejected += bad_rows
+    for writer in writers:
+        writer.close()
+    finished = time.perf_counter()
+
+    print(f"{rows:,} affordability rows written, {rejected:,} invalid rows rejected.", file=sys.stderr)
+    if args.timings:
+        print(f"startup: {ready - STARTED:.3f}s", file=sys.stderr)
+        print(f"read+compute+write: {finished - ready:.3f}s ({rows / max(finished - ready, 1e-9):,.0f} rows/s)",
+              file=sys.stderr)
+        print(f"total: {finished - STARTED:.3f}s", file=sys.stderr)
+    return 0
+
+
+def run(args):
+    # المكتبات الثقيلة تُستورد هنا فقط، وfpdf فقط عند طلب ملف PDF
+    if args.budgets:
+        return run_budgets(args)
+    from real_estate_export import COMPRESSIONS, WRITERS
+    from real_estate_import import CHUNK_SIZE, import_chunks
+
+    outputs = [(path, _output_format(path)) for path in args.output]
+    details = args.details and _output_format(args.details, DETAIL_FORMATS)
+    labels = _labels(args.labels)
+    ready = time.perf_counter()
+
+    writers = [(WRITERS[fmt](path, COMPRESSIONS[fmt][0]), fmt) for path, fmt in outputs if fmt in WRITERS]
+    pdf_paths = [path for path, fmt in outputs if fmt == "pdf"]
+    pdf_chunks = []
+    # أنواع العقار تحدد خط ملفات PDF، ولا تُقرأ دفعات صفحات التفاصيل إلا بعد فتح الملف
+    property_types = set()
+    rows = rejected = 0
+    for frame, bad_rows, _ in import_chunks(args.input, chunk_size=args.chunk_size or CHUNK_SIZE):
+        property_types.update(frame["property_type"].unique())
+        frame = frame.rename(columns=labels)
+        for writer, _ in writers:
+            writer.write(frame)
+        if pdf_paths:
+            pdf_chunks.append(frame)
+        rows += len(frame)
+        rejected += bad_rows
+    for writer, _ in writers:
+        writer.close()
+    computed = time.perf_counter()
+
+    if pdf_paths:
+        import pandas as pd
+        from real_estate_pdf import fit_font, render_pdf
+
+        frame = pd.concat(pdf_chunks, ignore_index=True)
+        # مثل تقرير الخدمة: الخط الموحد تلقائيًا لأنواع العقار أو أسماء الأعمدة خارج Latin-1
+        settings = fit_font(_report(args.report), [*map(str, frame.columns), *property_types])
+        data = render_pdf(frame, settings)
+        for path in pdf_paths:
+            with open(path, "wb") as output:
+                output.write(data)
+    rendered = time.perf_counter()
+
+    if details:
+        from real_estate_pdf import fit_font
+        from real_estate_reports import DETAIL_REPORT, write_detail_reports
+
+        settings = fit_font(DETAIL_REPORT, [*labels.values(), *property_types])
+        try:
+            with open(args.details, "wb") as output:
+                write_detail_reports(output, _numbered_chunks(args), details, labels, settings, method=args.method,
+                                     workers=args.workers)
+        except BaseException:
+            # لا يُترك ملف ناقص خلفنا
+            os.remove(args.details)
+            raise
+    finished = time.perf_counter()
+
+    print(f"{rows:,} properties written, {rejected:,} invalid rows rejected.", file=sys.stderr)
+    if args.timings:
+        total = finished - STARTED
+        print(f"startup: {ready - STARTED:.3f}s", file=sys.stderr)
+        print(f"read+compute+write: {computed - ready:.3f}s ({rows / max(computed - ready, 1e-9):,.0f} rows/s)",
+              file=sys.stderr)
+        if pdf_paths:
+            print(f"pdf: {rendered - computed:.3f}s", file=sys.stderr)
+        if details:
+            print(f"details: {finished - rendered:.3f}s", file=sys.stderr)
+        print(f"total: {total:.3f}s", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    return run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
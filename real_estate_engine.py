@@ -0,0 +1,92 @@
+import numpy as np
+
+# أعمدة الإدخال والإخراج الموحدة لجميع نسخ الحاسبة
+INPUT_COLUMNS = ["property_type", "price", "down_payment", "interest_rate", "years", "rental_percent"]
+OUTPUT_COLUMNS = ["net_value", "total_interest", "total_with_interest", "monthly_payment", "rent_value"]
+
+# قيم الفائدة والمدة التي تسمح بها نماذج الإدخال
+INTEREST_RATES = [round(i, 1) for i in [x * 0.1 for x in range(10, 71)]]
+LOAN_YEARS = list(range(1, 26))
+
+# ترتيب الأعمدة في الجدول المعروض
+COLUMNS = [
+    "property_type", "price", "down_payment", "net_value", "interest_rate", "years",
+    "total_interest", "total_with_interest", "monthly_payment", "rental_percent", "rent_value",
+]
+
+# أسماء الأعمدة المعروضة في كل نسخة من الحاسبة
+LABELS_EN = {
+    "property_type": "Property Type",
+    "price": "Price",
+    "down_payment": "Down Payment",
+    "net_value": "Net Property Value",
+    "interest_rate": "Annual Interest Rate (%)",
+    "years": "Years",
+    "total_interest": "Total Interest",
+    "total_with_interest": "Total With Interest",
+    "monthly_payment": "Monthly Payment",
+    "rental_percent": "Annual Rent Percentage (%)",
+    "rent_value": "Annual Rent",
+}
+
+LABELS_EN_SHORT = {
+    "property_type": "Property Type",
+    "price": "Price",
+    "down_payment": "Down Payment",
+    "net_value": "Net Value",
+    "interest_rate": "Interest Rate (%)",
+    "years": "Years",
+    "total_interest": "Total Interest",
+    "total_with_interest": "Total w/ Interest",
+    "monthly_payment": "Monthly Payment",
+    "rental_percent": "Rent (%)",
+    "rent_value": "Annual Rent",
+}
+
+LABELS_AR = {
+    "property_type": "نوع العقار",
+    "price": "سعر العقار",
+    "down_payment": "الدفعة المقدمة",
+    "net_value": "قيمة العقار الأصلي",
+    "interest_rate": "نسبة الفائدة السنوية",
+    "years": "عدد السنوات",
+    "total_interest": "إجمالي الفوائد",
+    "total_with_interest": "الإجمالي مع الفوائد",
+    "monthly_payment": "القسط الشهري",
+    "rental_percent": "نسبة الإيجار السنوية (%)",
+    "rent_value": "قيمة الإيجار",
+}
+
+
+def calculate(price, down_payment, interest_rate, years, rental_percent):
+    # حساب جميع الأعمدة المشتقة دفعة واحدة على مصفوفات NumPy
+    price = np.asarray(price, dtype=np.float64)
+    down_payment = np.asarray(down_payment, dtype=np.float64)
+    interest_rate = np.asarray(interest_rate, dtype=np.float64)
+    years = np.asarray(years, dtype=np.int64)
+    rental_percent = np.asarray(rental_percent, dtype=np.float64)
+
+    net_value = price - down_payment
+    total_interest = net_value * (interest_rate / 100) * years
+    total_with_interest = net_value + total_interest
+    monthly_payment = total_with_interest / (years * 12)
+    rent_value = net_value * (rental_percent / 100)
+
+    return {
+        "net_value": net_value,
+        "total_interest": total_interest,
+        "total_with_interest": total_with_interest,
+        "monthly_payment": monthly_payment,
+        "rent_value": rent_value,
+    }
+
+
+def calculate_frame(df):
+    # نفس الحساب على DataFrame يحتوي على أعمدة الإدخال
+    result = calculate(df["price"], df["down_payment"], df["interest_rate"], df["years"], df["rental_percent"])
+    return df.assign(**result)
+
+
+def invalid_down_payment(price, down_payment):
+    # الدفعة المقدمة لا يمكن أن تتجاوز سعر العقار
+    return np.asarray(down_payment, dtype=np.float64) > np.asarray(price, dtype=np.float64)
@@ -0,0 +1,150 @@
+import bz2
+import gzip
+import io
+
+CHUNK_SIZE = 50_000
+MAX_XLSX_ROWS = 1_048_575
+
+# خيارات الضغط لكل صيغة؛ الأول هو الافتراضي، وXLSX مضغوط أصلًا كملف zip
+COMPRESSIONS = {
+    "csv": [None, "gzip", "bz2"],
+    "xlsx": [None],
+    "parquet": ["snappy", "zstd", "gzip", None],
+}
+EXTENSIONS = {"csv": "csv", "xlsx": "xlsx", "parquet": "parquet", "gzip": "gz", "bz2": "bz2"}
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def arrow_table(frame, schema=None):
+    # الأعمدة الفئوية تُكتب كنصوص عادية حتى يبقى المخطط ثابتًا بين الدفعات
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if schema is None:
+        fields = [
+            pa.field(field.name, pa.string())
+            if pa.types.is_dictionary(field.type) or pa.types.is_large_string(field.type)
+            else field
+            for field in table.schema
+        ]
+        schema = pa.schema(fields)
+    return table.cast(schema)
+
+
+class ArrowWriter:
+    # كتابة الدفعات واحدة تلو الأخرى بمخطط الدفعة الأولى
+    def __init__(self, target, compression=None):
+        self.target = target
+        self.compression = compression
+        self.schema = None
+        self._writer = None
+
+    def _open(self, schema):
+        raise NotImplementedError
+
+    def write(self, frame):
+        table = arrow_table(frame, self.schema)
+        if self._writer is None:
+            self.schema = table.schema
+            self._writer = self._open(table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class CSVWriter(ArrowWriter):
+    # ضغط gzip وbz2 عبر مكتبات بايثون لأنها لا تغلق الذاكرة المؤقتة عند الإغلاق
+    def _open(self, schema):
+        import pyarrow.csv as pa_csv
+
+        self._stream = None
+        if not self.compression:
+            return pa_csv.CSVWriter(self.target, schema)
+        if self.compression == "gzip":
+            # المستوى 6 أسرع بكثير من المستوى الافتراضي 9 والفرق في الحجم صغير
+            self._stream = gzip.open(self.target, "wb", compresslevel=6)
+        else:
+            self._stream = bz2.open(self.target, "wb")
+        return pa_csv.CSVWriter(self._stream, schema)
+
+    def close(self):
+        super().close()
+        if self._writer is not None and self._stream is not None:
+            self._stream.close()
+
+
+class ParquetWriter(ArrowWriter):
+    # كل دفعة تصبح row group في ملف Parquet واحد
+    def _open(self, schema):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(self.target, schema, compression=self.compression or "none")
+
+
+class XLSXWriter:
+    # openpyxl في وضع الكتابة فقط يكتب الصفوف تباعًا دون الاحتفاظ بالورقة كاملة في الذاكرة
+    # ويبدأ ورقة جديدة عند بلوغ حد Excel لعدد الصفوف
+    def __init__(self, target, compression=None):
+        self.target = target
+        self._workbook = None
+
+    def _new_sheet(self):
+        self._sheet = self._workbook.create_sheet(f"Records {len(self._workbook.worksheets) + 1}")
+        self._sheet.append(self._header)
+        self._rows = 0
+
+    def write(self, frame):
+        if self._workbook is None:
+            from openpyxl import Workbook
+
+            self._workbook = Workbook(write_only=True)
+            self._header = [str(name) for name in frame.columns]
+            self._new_sheet()
+        for row in zip(*(frame[name].tolist() for name in frame.columns)):
+            if self._rows == MAX_XLSX_ROWS:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._rows += 1
+
+    def add_sheet(self, title, frame):
+        # ورقة إضافية صغيرة (ملخص المحفظة مثلًا) بعد أوراق السجلات
+        if self._workbook is None:
+            return
+        sheet = self._workbook.create_sheet(title)
+        sheet.append([str(name) for name in frame.columns])
+        for row in zip(*(frame[name].tolist() for name in frame.columns)):
+            sheet.append(row)
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.save(self.target)
+
+
+WRITERS = {"csv": CSVWriter, "xlsx": XLSXWriter, "parquet": ParquetWriter}
+
+
+def export_buffer(frames, fmt, compression=None, summary=None):
+    # كتابة الدفعات في ذاكرة مؤقتة واحدة جاهزة لزر التحميل؛ الملخص يُضاف كورقة في XLSX فقط
+    buffer = io.BytesIO()
+    writer = WRITERS[fmt](buffer, compression)
+    for frame in frames:
+        writer.write(frame)
+    if summary is not None and isinstance(writer, XLSXWriter):
+        writer.add_sheet("Summary", summary)
+    writer.close()
+    buffer.seek(0)
+    return buffer
+
+
+def export_file_name(name, fmt, compression=None):
+    # الضغط داخل Parquet لا يغير امتداد الملف، أما CSV المضغوط فيأخذ .gz أو .bz2
+    extension = EXTENSIONS[fmt]
+    if fmt == "csv" and compression:
+        extension += "." + EXTENSIONS[compression]
+    return f"{name}.{extension}"
@@ -0,0 +1,127 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+from real_estate_engine import COLUMNS, INPUT_COLUMNS, LABELS_AR, LABELS_EN, LABELS_EN_SHORT, calculate_frame
+
+CHUNK_SIZE = 50_000
+SUPPORTED_TYPES = ["csv", "xlsx", "parquet"]
+DEFAULT_RENTAL_PERCENT = 5.0
+INPUT_DTYPES = {
+    "price": np.float64,
+    "down_payment": np.float64,
+    "interest_rate": np.float64,
+    "years": np.int64,
+    "rental_percent": np.float64,
+}
+
+# قبول أسماء الأعمدة الداخلية أو أسماء الأعمدة المعروضة في أي نسخة
+COLUMN_ALIASES = {name: name for name in COLUMNS}
+for labels in (LABELS_EN, LABELS_EN_SHORT, LABELS_AR):
+    COLUMN_ALIASES.update({label: name for name, label in labels.items()})
+
+
+def _file_size(source):
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def _read_csv(source, chunk_size):
+    size = _file_size(source)
+    for chunk in pd.read_csv(source, chunksize=chunk_size):
+        yield chunk, source.tell() / size if size else 1.0
+
+
+def _read_parquet(source, chunk_size):
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(source)
+    total = parquet_file.metadata.num_rows or 1
+    done = 0
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        done += batch.num_rows
+        yield batch.to_pandas(), done / total
+
+
+def _read_xlsx(source, chunk_size):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        total = max((sheet.max_row or 1) - 1, 1)
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        done = 0
+        while True:
+            block = list(itertools.islice(rows, chunk_size))
+            if not block:
+                break
+            done += len(block)
+            yield pd.DataFrame(block, columns=header), min(done / total, 1.0)
+    finally:
+        workbook.close()
+
+
+READERS = {"csv": _read_csv, "xlsx": _read_xlsx, "parquet": _read_parquet}
+
+
+def _read_path(reader, path, chunk_size):
+    with open(path, "rb") as source:
+        yield from reader(source, chunk_size)
+
+
+def read_chunks(source, file_name=None, chunk_size=CHUNK_SIZE):
+    # قراءة الملف على دفعات مع نسبة التقدم التقريبية لكل دفعة
+    file_name = file_name or os.fspath(source)
+    extension = os.path.splitext(file_name)[1].lower().lstrip(".")
+    if extension not in READERS:
+        raise ValueError(f"Unsupported file type: {file_name}")
+    if isinstance(source, (str, os.PathLike)):
+        return _read_path(READERS[extension], source, chunk_size)
+    return READERS[extension](source, chunk_size)
+
+
+def normalize_chunk(chunk):
+    # توحيد أسماء الأعمدة وأنواع البيانات
+    chunk = chunk.rename(columns=lambda column: COLUMN_ALIASES.get(str(column).strip(), column))
+    if "rental_percent" not in chunk.columns:
+        chunk["rental_percent"] = DEFAULT_RENTAL_PERCENT
+    missing = [name for name in INPUT_COLUMNS if name not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    chunk = chunk[INPUT_COLUMNS].copy()
+    chunk["property_type"] = chunk["property_type"].astype("string")
+    for name in INPUT_DTYPES:
+        chunk[name] = pd.to_numeric(chunk[name], errors="coerce")
+    return chunk
+
+
+def validate_chunk(chunk):
+    # استبعاد الصفوف الناقصة، والمبالغ السالبة، والمدد غير الصحيحة (2.7 مثلًا كانت تُقص إلى 2)،
+    # والصفوف التي تتجاوز فيها الدفعة المقدمة سعر العقار
+    years = chunk["years"].to_numpy()
+    valid = (
+        chunk.notna().all(axis=1).to_numpy()
+        & (years >= 1)
+        & (np.mod(years, 1) == 0)
+        & (chunk["price"].to_numpy() >= 0)
+        & (chunk["down_payment"].to_numpy() >= 0)
+        & (chunk["down_payment"].to_numpy() <= chunk["price"].to_numpy())
+    )
+    return chunk[valid], int(np.count_nonzero(~valid))
+
+
+def import_chunks(source, file_name=None, chunk_size=CHUNK_SIZE):
+    # لكل دفعة: الصفوف المحسوبة، عدد الصفوف المرفوضة، ونسبة التقدم
+    for chunk, progress in read_chunks(source, file_name, chunk_size):
+        valid, rejected = validate_chunk(normalize_chunk(chunk))
+        valid = valid.astype(INPUT_DTYPES)
+        yield calculate_frame(valid)[COLUMNS].reset_index(drop=True), rejected, progress
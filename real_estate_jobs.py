@@ -0,0 +1,76 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from real_estate_cache import report_cache, report_key
+from real_estate_pdf import render_pdf
+
+MAX_WORKERS = 4
+
+# مجمع عمال مشترك بين جميع الجلسات في نفس العملية
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="pdf-export")
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportJob:
+    # مهمة تصدير PDF في الخلفية مع تتبع التقدم وإمكانية الإلغاء
+    def __init__(self, dataframe, settings, cache=report_cache):
+        self.total = len(dataframe)
+        self.rows_done = 0
+        self.seconds = None
+        self._cancel = threading.Event()
+        self._cache = cache
+        self.key = report_key(dataframe, settings)
+
+        cached = cache.get(self.key)
+        if cached is not None:
+            # تقرير مطابق موجود في الذاكرة: لا حاجة لإعادة الإنشاء
+            self.rows_done = self.total
+            self.seconds = 0.0
+            self.future = Future()
+            self.future.set_result(cached)
+            return
+        # نسخة ثابتة من البيانات: إطارات المخزن عروض تتغير مع أول تعديل أو حذف أو مسح أثناء التصدير
+        self.future = _executor.submit(self._run, dataframe.copy(), settings)
+
+    def _run(self, dataframe, settings):
+        start = time.perf_counter()
+        data = render_pdf(dataframe, settings, progress=self._progress)
+        self.seconds = time.perf_counter() - start
+        self._cache.put(self.key, data)
+        return data
+
+    def _progress(self, rows_done):
+        if self._cancel.is_set():
+            raise ExportCancelled()
+        self.rows_done = rows_done
+
+    @property
+    def progress(self):
+        return self.rows_done / self.total if self.total else 1.0
+
+    def running(self):
+        return not self.future.done()
+
+    def cancel(self):
+        self._cancel.set()
+        self.future.cancel()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def result(self):
+        # البايتات الجاهزة، أو None إذا أُلغيت المهمة ولو اكتمل الملف بعد طلب الإلغاء
+        if self.cancelled():
+            return None
+        try:
+            return self.future.result()
+        except ExportCancelled:
+            return None
+
+
+def submit_export(dataframe, settings):
+    return ExportJob(dataframe, settings)
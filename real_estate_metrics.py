@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+METRICS_ENV = "REAL_ESTATE_METRICS"
+
+_NO_PHASE = nullcontext()
+_log_lock = threading.Lock()
+
+
+class _Phase:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.metrics.add(self.name, time.perf_counter() - self.start)
+
+
+class RerunMetrics:
+    # توقيت مراحل إعادة تشغيل السكربت الواحدة؛ عند الإيقاف لا يُقاس أي شيء
+    def __init__(self, enabled=False, log_path=None, script=None, rerun=0):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.script = script
+        self.rerun = rerun
+        self.phases = {}
+        self.started = self._lap = time.perf_counter() if enabled else None
+
+    def phase(self, name):
+        return _Phase(self, name) if self.enabled else _NO_PHASE
+
+    def mark(self, name):
+        # الزمن منذ العلامة السابقة، لتقسيم كتل السكربت دون إعادة إزاحتها داخل with
+        if self.enabled:
+            now = time.perf_counter()
+            self.add(name, now - self._lap)
+            self._lap = now
+
+    def add(self, name, seconds):
+        if self.enabled:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def finish(self, **fields):
+        # سطر JSON واحد لكل إعادة تشغيل في ملف السجل إن وُجد
+        if not self.enabled:
+            return None
+        entry = {
+            "time": time.time(),
+            "script": self.script,
+            "rerun": self.rerun,
+            "total": time.perf_counter() - self.started,
+            "phases": dict(self.phases),
+            **fields,
+        }
+        if self.log_path:
+            line = json.dumps(entry, ensure_ascii=False, default=str)
+            with _log_lock, open(self.log_path, "a", encoding="utf-8") as log:
+                log.write(line + "\n")
+        return entry
+
+
+def metrics_log_path():
+    return os.environ.get(METRICS_ENV) or None
+
+
+def estimate_bytes(value):
+    # تقدير سريع لحجم الكائنات الكبيرة المعتادة في الجلسة دون المرور على كل عنصر
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, (pd.Series, pd.Index, np.ndarray)) or hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(getattr(value, "data", None), pd.DataFrame):
+        return estimate_bytes(value.data)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(item) for item in value.values())
+    return sys.getsizeof(value)
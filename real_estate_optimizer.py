@@ -0,0 +1,220 @@
+import sys
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+OBJECTIVES = ["rent_value", "net_rent"]
+EXACT_LIMIT = 400
+TIME_LIMIT = 2.0
+MULTIPLIERS = np.linspace(0.0, 1.0, 11)
+SWAP_BLOCK = 256
+CHECK_EVERY = 4096
+TOLERANCE = 1e-9
+
+
+class _Timeout(Exception):
+    pass
+
+
+def objective_values(frame, objective="rent_value"):
+    # الإيجار السنوي، أو الإيجار ناقص متوسط الفائدة السنوية (إجمالي الفوائد ÷ عدد السنوات)
+    rent = frame["rent_value"].to_numpy(dtype=np.float64)
+    if objective == "rent_value":
+        return rent
+    if objective == "net_rent":
+        return rent - frame["total_interest"].to_numpy(dtype=np.float64) / frame["years"].to_numpy()
+    raise ValueError(f"Unknown objective: {objective}")
+
+
+def optimize_portfolio(frame, max_down_payment=None, max_monthly_payment=None, objective="rent_value",
+                       method="auto", time_limit=TIME_LIMIT):
+    # أفضل مجموعة عقارات تحت سقف لمجموع الدفعات المقدمة ولمجموع الأقساط الشهرية (None = بلا سقف)
+    # الحل الدقيق (تفرع وتحديد) للأعداد المعتدلة، وحل تقريبي محدود الوقت للأعداد الكبيرة
+    started = time.perf_counter()
+    deadline = started + time_limit
+    values = objective_values(frame, objective)
+    columns = [
+        (frame[name].to_numpy(dtype=np.float64), limit)
+        for name, limit in (("down_payment", max_down_payment), ("monthly_payment", max_monthly_payment))
+        if limit is not None
+    ]
+
+    # يُستبعد ما لا يضيف قيمة وما يتجاوز أحد السقفين وحده
+    candidates = values > 0
+    for column, limit in columns:
+        candidates &= column <= limit + TOLERANCE
+    # القيود تُقسم على سقفها فتصبح سعة كل قيد 1؛ القيد الذي سقفه صفر لا يبقى فيه إلا عقارات وزنها صفر
+    items = np.flatnonzero(candidates)
+    rows = [column[items] / limit for column, limit in columns if limit > 0]
+    weights = np.array(rows) if rows else np.empty((0, len(items)))
+    values = values[candidates]
+
+    chosen, optimal, bound, solver = _solve(values, weights, method, deadline)
+    ids = np.sort(frame.index.to_numpy()[items[chosen]])
+    selected = frame.loc[ids]
+    return {
+        "ids": ids,
+        "objective": float(values[chosen].sum()),
+        "bound": bound,
+        "optimal": optimal,
+        "method": solver,
+        "candidates": len(items),
+        "down_payment": float(selected["down_payment"].sum()),
+        "monthly_payment": float(selected["monthly_payment"].sum()),
+        "rent_value": float(selected["rent_value"].sum()),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _solve(values, weights, method, deadline):
+    if method not in ("auto", "exact", "heuristic"):
+        raise ValueError(f"Unknown optimization method: {method}")
+    free = ~weights.any(axis=0)
+    if free.all():
+        # بلا قيود فعلية: كل عقار بقيمة موجبة يدخل
+        return free, True, float(values.sum()), "exact"
+
+    # أفضل معامل لدمج القيدين هو الذي يعطي أصغر حد أعلى
+    bounds = []
+    for multiplier in MULTIPLIERS if len(weights) == 2 else [1.0]:
+        surrogate = _surrogate(weights, multiplier)
+        bounds.append((_fractional_bound(values, surrogate), multiplier))
+    bound, multiplier = min(bounds)
+
+    chosen = max(
+        (_greedy(weights, _efficiency_order(values, _surrogate(weights, m))) for _, m in bounds),
+        key=lambda mask: values[mask].sum(),
+    )
+    chosen = _local_search(values, weights, chosen, deadline)
+    if method == "heuristic" or (method == "auto" and len(values) > EXACT_LIMIT):
+        return chosen, bool(values[chosen].sum() >= bound - TOLERANCE), bound, "heuristic"
+
+    chosen, optimal = _branch_and_bound(values, weights, multiplier, chosen, deadline)
+    return chosen, optimal, bound, "exact" if optimal else "heuristic"
+
+
+def _surrogate(weights, multiplier):
+    # دمج القيدين في قيد واحد سعته 1؛ كل حل يحقق القيدين يحقق القيد المدمج، فحدّه الأعلى صالح
+    if len(weights) == 1:
+        return weights[0]
+    return multiplier * weights[0] + (1.0 - multiplier) * weights[1]
+
+
+def _efficiency_order(values, surrogate):
+    with np.errstate(divide="ignore"):
+        ratio = np.where(surrogate > 0, values / np.where(surrogate > 0, surrogate, 1.0), np.inf)
+    return np.argsort(-ratio, kind="stable")
+
+
+def _fractional_bound(values, surrogate):
+    # حد أعلى للقيد المدمج بالسماح بأخذ جزء من عنصر واحد
+    order = _efficiency_order(values, surrogate)
+    cum_weight = np.cumsum(surrogate[order])
+    full = int(np.searchsorted(cum_weight, 1.0 + TOLERANCE, side="right"))
+    bound = float(values[order[:full]].sum())
+    if full < len(order):
+        item = order[full]
+        spare = 1.0 - (cum_weight[full - 1] if full else 0.0)
+        bound += spare * values[item] / surrogate[item]
+    return bound
+
+
+def _greedy(weights, order):
+    # ملء بالترتيب المعطى مع تخطي ما لا يتسع في أي من القيدين
+    chosen = np.zeros(weights.shape[1], dtype=bool)
+    rows = [row.tolist() for row in weights]
+    used = [0.0] * len(rows)
+    for item in order.tolist():
+        if all(total + row[item] <= 1.0 + TOLERANCE for total, row in zip(used, rows)):
+            chosen[item] = True
+            used = [total + row[item] for total, row in zip(used, rows)]
+    return chosen
+
+
+def _local_search(values, weights, chosen, deadline):
+    # إضافة ما يتسع، ثم تبديل عقار مختار بآخر أعلى قيمة، حتى لا يبقى تحسين أو ينتهي الوقت
+    chosen = chosen.copy()
+    while time.perf_counter() < deadline:
+        slack = 1.0 - weights[:, chosen].sum(axis=1)
+        outside = np.flatnonzero(~chosen)
+        if not len(outside):
+            break
+        fits = np.all(weights[:, outside] <= slack[:, None] + TOLERANCE, axis=0)
+        if fits.any():
+            candidates = outside[fits]
+            chosen[candidates[np.argmax(values[candidates])]] = True
+            continue
+
+        best_gain, best_swap = TOLERANCE, None
+        inside = np.flatnonzero(chosen)
+        for start in range(0, len(inside), SWAP_BLOCK):
+            block = inside[start:start + SWAP_BLOCK]
+            gain = values[outside][None, :] - values[block][:, None]
+            for row, limit in zip(weights, slack):
+                gain[row[outside][None, :] - row[block][:, None] > limit + TOLERANCE] = -np.inf
+            flat = int(np.argmax(gain))
+            if gain.flat[flat] > best_gain:
+                best_gain = gain.flat[flat]
+                best_swap = block[flat // len(outside)], outside[flat % len(outside)]
+        if best_swap is None:
+            break
+        chosen[best_swap[0]] = False
+        chosen[best_swap[1]] = True
+    return chosen
+
+
+def _branch_and_bound(values, weights, multiplier, best, deadline):
+    # بحث بالعمق بترتيب الكفاءة، يبدأ من أفضل حل تقريبي ويقطع كل فرع لا يتجاوز حدّه الأعلى هذا الحل
+    # عند انتهاء الوقت يبقى أفضل حل وُجد ولا يُعد مثاليًا
+    surrogate = _surrogate(weights, multiplier)
+    order = _efficiency_order(values, surrogate)
+    value_list = values[order].tolist()
+    rows = [row[order].tolist() for row in weights]
+    surrogate_list = surrogate[order].tolist()
+    cum_weight = np.concatenate([[0.0], np.cumsum(surrogate_list)]).tolist()
+    cum_value = np.concatenate([[0.0], np.cumsum(value_list)]).tolist()
+    scales = [multiplier, 1.0 - multiplier] if len(rows) == 2 else [1.0]
+    count = len(value_list)
+
+    best_value = float(values[best].sum())
+    best_items = np.flatnonzero(best[order]).tolist()
+    chosen = []
+    nodes = 0
+
+    def bound(k, used):
+        # العناصر من k حتى آخر عنصر يتسع كاملًا في السعة المدمجة الباقية، ثم جزء من التالي
+        spare = sum(scale * (1.0 - total) for scale, total in zip(scales, used))
+        end = bisect_right(cum_weight, cum_weight[k] + spare + TOLERANCE, lo=k) - 1
+        total = cum_value[end] - cum_value[k]
+        if end < count and surrogate_list[end] > 0:
+            total += (spare - (cum_weight[end] - cum_weight[k])) * value_list[end] / surrogate_list[end]
+        return total
+
+    def search(k, value, used):
+        nonlocal best_value, best_items, nodes
+        nodes += 1
+        if nodes % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            raise _Timeout()
+        if value > best_value + TOLERANCE:
+            best_value, best_items = value, list(chosen)
+        if k == count or value + bound(k, used) <= best_value + TOLERANCE:
+            return
+        if all(total + row[k] <= 1.0 + TOLERANCE for total, row in zip(used, rows)):
+            chosen.append(k)
+            search(k + 1, value + value_list[k], [total + row[k] for total, row in zip(used, rows)])
+            chosen.pop()
+        search(k + 1, value, used)
+
+    optimal = True
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursion_limit, 2 * count + 100))
+    try:
+        search(0, 0.0, [0.0] * len(rows))
+    except _Timeout:
+        optimal = False
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+    result = np.zeros(count, dtype=bool)
+    result[order[best_items]] = True
+    return result, optimal
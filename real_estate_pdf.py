@@ -0,0 +1,305 @@
+import atexit
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+import arabic_reshaper
+import numpy as np
+import pandas as pd
+from bidi.algorithm import get_display
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+ROW_CHUNK = 1000
+MIN_FONT_SIZE = 5
+SHAPE_CACHE_SIZE = 65_536
+
+# خط Unicode للتقارير العربية: المسار من REAL_ESTATE_PDF_FONT، وإلا أول خط DejaVu Sans موجود في النظام
+FONT_ENV = "REAL_ESTATE_PDF_FONT"
+UNICODE_FAMILY = "ReportSans"
+FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/usr/local/share/fonts/DejaVuSans.ttf",
+    "/Library/Fonts/DejaVuSans.ttf",
+    "C:/Windows/Fonts/DejaVuSans.ttf",
+]
+# الحروف التي تحتاجها التقارير: اللاتينية والعربية وأشكال الحروف العربية بعد التشكيل
+FONT_UNICODES = [
+    *range(0x20, 0x7F), *range(0xA0, 0x100), *range(0x600, 0x700), *range(0xFB50, 0xFE00), *range(0xFE70, 0xFF00),
+    0x2013, 0x2014, 0x2212,
+]
+
+# إعدادات التقارير المستخدمة في نسخ الحاسبة المختلفة
+PORTRAIT_REPORT = {
+    "title": "Real Estate Purchase Summary",
+    "orientation": "P",
+    "title_size": 14,
+    "title_gap": 5,
+    "font_size": 9,
+    "row_height": 6,
+    "fill_color": (230, 230, 250),
+}
+
+LANDSCAPE_REPORT = {
+    "title": "Real Estate Summary",
+    "orientation": "L",
+    "title_size": 12,
+    "title_gap": 5,
+    "font_size": 9,
+    "row_height": 6,
+    "fill_color": (200, 230, 255),
+}
+
+LANDSCAPE_COMPACT_REPORT = {
+    "title": "Real Estate Summary",
+    "orientation": "L",
+    "title_size": 10,
+    "title_gap": 3,
+    "font_size": 7,
+    "row_height": 5,
+    "fill_color": (200, 230, 255),
+}
+
+ARABIC_REPORT = {
+    "title": "ملخص شراء العقارات",
+    "orientation": "L",
+    "title_size": 14,
+    "title_gap": 5,
+    "font_size": 9,
+    "row_height": 6,
+    "fill_color": (230, 230, 250),
+    "unicode_font": True,
+    "rtl": True,
+}
+
+
+class PDF(FPDF):
+    # فئة واحدة مشتركة بدلًا من تعريف PDF داخل كل ضغطة زر
+    def __init__(self, title, orientation="P", title_size=14, title_gap=5, font_size=9, row_height=6,
+                 fill_color=(230, 230, 250), unicode_font=False, rtl=False):
+        super().__init__(orientation=orientation, unit="mm", format="A4")
+        self.report_title = title
+        self.title_size = title_size
+        self.title_gap = title_gap
+        self.table_font_size = font_size
+        self.row_height = row_height
+        self.header_fill = fill_color
+        self.rtl = rtl
+        self.font_name = "Helvetica"
+        self.shape = None
+        if unicode_font:
+            # الخط المصغر يُنشأ مرة واحدة لكل عملية، ويكتفي fpdf هنا بقراءة ملف صغير
+            for style in ("", "B"):
+                self.add_font(UNICODE_FAMILY, style, unicode_font_path(style))
+            self.font_name = UNICODE_FAMILY
+            self.shape = shape_text
+
+    def header(self):
+        self.set_font(self.font_name, "B", self.title_size)
+        self.cell(0, 10, self._text(self.report_title), align="C", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(self.title_gap)
+
+    def _text(self, text):
+        return self.shape(text) if self.shape else text
+
+    def table(self, dataframe, progress=None):
+        # رسم الجدول على دفعات من الصفوف: تنسيق الأعمدة دفعة واحدة، وتكرار رأس الجدول في كل صفحة
+        self.set_font(self.font_name, "", self.table_font_size)
+        if self.rtl:
+            # العمود الأول في أقصى اليمين
+            dataframe = dataframe.iloc[:, ::-1]
+        self.column_widths = self._column_widths(dataframe)
+        self.char_widths = _CharWidths(self)
+        self.header_labels = [str(col) for col in dataframe.columns]
+        self.header_lines = self._header_lines()
+        self._table_header()
+
+        for start in range(0, len(dataframe), ROW_CHUNK):
+            chunk = dataframe.iloc[start:start + ROW_CHUNK]
+            self._table_rows(zip(*(format_column(chunk[col], self.shape) for col in chunk.columns)))
+            if progress is not None:
+                progress(start + len(chunk))
+        self._table_borders()
+
+    def _column_widths(self, dataframe):
+        # عرض كل عمود حسب أعرض قيمة فيه، ثم تكبير أو تصغير الأعمدة لتملأ عرض الصفحة
+        padding = 2 * self.c_margin
+        widths = []
+        for col in dataframe.columns:
+            # الكلمة العربية تُقاس قبل التشكيل وبعده، لأن multi_cell يقسم العنوان بنصه المنطقي
+            words = [
+                max(self.get_string_width(word), self.get_string_width(self._text(word))) for word in str(col).split()
+            ]
+            content = [self.get_string_width(self._text(text)) for text in widest_values(dataframe[col])]
+            widths.append(max(words + content + [0]))
+
+        scale = (self.epw - padding * len(widths)) / sum(widths)
+        if scale < 1:
+            # تصغير الخط حتى تتسع الأعمدة في عرض الصفحة
+            self.set_font_size(max(self.font_size_pt * scale, MIN_FONT_SIZE))
+        return [width * scale + padding for width in widths]
+
+    def _header_lines(self):
+        # تقسيم عناوين الأعمدة إلى أسطر مرة واحدة لكل جدول؛ النص العربي يُقسم بترتيبه المنطقي ثم يُشكَّل كل سطر
+        lines = [
+            self.multi_cell(width + 0.01, self.row_height, label, dry_run=True, output="LINES")
+            for width, label in zip(self.column_widths, self.header_labels)
+        ]
+        return [[self._text(line) for line in column] for column in lines]
+
+    def _align(self, x, width, text):
+        # بداية النص داخل الخلية: من اليسار، أو محاذاة لليمين في التقارير العربية
+        if self.rtl:
+            return x + width - self.c_margin - sum(map(self.char_widths.__getitem__, text))
+        return x + self.c_margin
+
+    def _table_header(self):
+        self.set_fill_color(*self.header_fill)
+        height = max(map(len, self.header_lines)) * self.row_height
+        baseline = 0.5 * self.row_height + 0.3 * self.font_size
+        x, y = self.l_margin, self.y
+        for width, lines in zip(self.column_widths, self.header_lines):
+            self.rect(x, y, width, height, style="DF")
+            for number, line in enumerate(lines):
+                self.text(self._align(x, width, line), y + number * self.row_height + baseline, line)
+            x += width
+        self.set_xy(self.l_margin, y + height)
+        self.table_top = self.y
+
+    def _table_rows(self, rows):
+        left = self.l_margin
+        right = left + sum(self.column_widths)
+        height = self.row_height
+        baseline = 0.5 * height + 0.3 * self.font_size
+        for row in rows:
+            if self.y + height > self.page_break_trigger:
+                self._table_borders()
+                self.add_page()
+                self._table_header()
+            y = self.y
+            x = left
+            for text, width in zip(row, self.column_widths):
+                self.text(self._align(x, width, text), y + baseline, text)
+                x += width
+            self.line(left, y + height, right, y + height)
+            self.set_y(y + height)
+
+    def _table_borders(self):
+        # الخطوط الرأسية ترسم مرة واحدة لكل صفحة بدلًا من إطار لكل خلية
+        x = self.l_margin
+        for width in [0, *self.column_widths]:
+            x += width
+            self.line(x, self.table_top, x, self.y)
+
+
+class _CharWidths(dict):
+    # عرض كل حرف بالخط والحجم الحاليين يُقاس مرة واحدة؛ عرض النص مجموع عرض حروفه دون get_string_width لكل خلية
+    def __init__(self, pdf):
+        super().__init__()
+        self.pdf = pdf
+
+    def __missing__(self, char):
+        width = self[char] = self.pdf.get_string_width(char)
+        return width
+
+
+def format_column(values, shape=None):
+    # تنسيق عمود كامل مرة واحدة بدلًا من تنسيق كل خلية داخل iterrows؛ التشكيل للفئات مرة واحدة لا لكل صف
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = [str(value) for value in values.cat.categories]
+        labels = np.array([*(map(shape, categories) if shape else categories), ""], dtype=object)
+        return labels[values.cat.codes.to_numpy()]
+    if pd.api.types.is_float_dtype(values.dtype):
+        return [f"{value:,.2f}" for value in values.tolist()]
+    text = values.astype(str).tolist()
+    return [shape(value) for value in text] if shape else text
+
+
+def widest_values(values):
+    # القيم المرشحة لأن تكون الأعرض في العمود دون قياس كل خلية
+    values = values.dropna()
+    if values.empty:
+        return []
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return [str(value) for value in values.cat.categories]
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return format_column(pd.Series([values.min(), values.max()], dtype=values.dtype))
+    text = values.astype(str)
+    lengths = text.str.len()
+    return text[lengths == lengths.max()].unique()[:5].tolist()
+
+
+def shape_text(text):
+    # تشكيل الحروف العربية وترتيبها للعرض من اليمين لليسار؛ النص اللاتيني والأرقام تمر كما هي
+    return text if text.isascii() else _shape(text)
+
+
+@lru_cache(maxsize=SHAPE_CACHE_SIZE)
+def _shape(text):
+    # التشكيل أبطأ بكثير من رسم النص، والقيم نفسها (أنواع العقار والعناوين) تتكرر في كل صف وتقرير
+    return get_display(arabic_reshaper.reshape(text))
+
+
+def font_source(style=""):
+    path = os.environ.get(FONT_ENV)
+    if path:
+        bold = path.replace(".ttf", "-Bold.ttf")
+        return bold if style == "B" and os.path.exists(bold) else path
+    for path in FONT_PATHS:
+        if style == "B":
+            path = path.replace(".ttf", "-Bold.ttf")
+        if os.path.exists(path):
+            return path
+    if style == "B":
+        return font_source()
+    raise FileNotFoundError(f"No Unicode font for Arabic reports was found; set {FONT_ENV} to a TTF file")
+
+
+@lru_cache(maxsize=None)
+def unicode_font_path(style=""):
+    # نسخة مصغرة من الخط فيها الحروف المستخدمة فقط: تحميلها وتضمينها في كل تقرير أسرع بكثير من الخط الكامل
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    options = subset.Options()
+    options.layout_features = []
+    options.hinting = False
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    options.drop_tables += ["FFTM"]
+    font = TTFont(font_source(style))
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=FONT_UNICODES)
+    subsetter.subset(font)
+    path = os.path.join(_font_dir(), f"report_sans{style.lower()}.ttf")
+    font.save(path)
+    return path
+
+
+def fit_font(settings, texts):
+    # خط Helvetica لا يغطي إلا Latin-1، فأنواع العقار أو أسماء الأعمدة العربية مثلًا تحتاج الخط الموحد
+    if settings.get("unicode_font"):
+        return settings
+    try:
+        "".join(texts).encode("latin-1")
+    except UnicodeEncodeError:
+        return {**settings, "unicode_font": True}
+    return settings
+
+
+@lru_cache(maxsize=None)
+def _font_dir():
+    path = tempfile.mkdtemp(prefix="real_estate_fonts_")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def render_pdf(dataframe, settings=PORTRAIT_REPORT, progress=None):
+    # إنشاء الملف في الذاكرة وإرجاع البايتات مباشرة لزر التحميل دون أي ملف مؤقت
+    pdf = PDF(**settings)
+    pdf.add_page()
+    pdf.table(dataframe, progress)
+    return bytes(pdf.output())
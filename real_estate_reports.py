@@ -0,0 +1,313 @@
+import atexit
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from real_estate_amortization import METHODS, monthly_payment, schedule, total_interest
+from real_estate_engine import COLUMNS, INPUT_COLUMNS, OUTPUT_COLUMNS
+from real_estate_pdf import PDF
+
+CHUNK_SIZE = 100
+MAX_PENDING = 2
+REPORT_FORMATS = ["pdf", "zip"]
+REPORT_MIME_TYPES = {"pdf": "application/pdf", "zip": "application/zip"}
+
+# إعدادات صفحة التفاصيل: صفحة طولية لكل عقار مهما كان اتجاه تقرير الملخص
+DETAIL_REPORT = {
+    "title": "Property",
+    "orientation": "P",
+    "title_size": 14,
+    "title_gap": 3,
+    "font_size": 9,
+    "row_height": 5.5,
+    "fill_color": (230, 230, 250),
+}
+
+# للنسخ التي فيها أنواع عقار أو أسماء أعمدة عربية
+UNICODE_DETAIL_REPORT = {**DETAIL_REPORT, "unicode_font": True}
+
+# عناوين أقسام الصفحة وأعمدة جداول السداد
+DETAIL_TEXTS = {
+    "inputs": "Inputs",
+    "outputs": "Results",
+    "amortization": "Amortization Summary",
+    "yearly": "Yearly Schedule: {method}",
+    "method": "Method",
+    "flat": "Flat interest",
+    "annuity": "Reducing balance (annuity)",
+    "monthly_payment": "Monthly Payment",
+    "total_interest": "Total Interest",
+    "total_paid": "Total Paid",
+    "year": "Year",
+    "payment": "Payment",
+    "principal": "Principal",
+    "interest": "Interest",
+    "balance": "Balance",
+}
+
+_REFERENCE = re.compile(rb"(\d+) 0 R")
+
+
+class DetailPDF(PDF):
+    # صفحة لكل عقار: المدخلات والنتائج، وملخص السداد بالطريقتين، وجدول سنوي بالطريقة المختارة
+    def __init__(self, title, **settings):
+        super().__init__(title, **settings)
+        self.detail_title = title
+
+    def property_page(self, record_id, values, yearly, amortization, labels, method, texts=DETAIL_TEXTS):
+        self.report_title = f"{self.detail_title} #{record_id}: {values['property_type']}"
+        self.add_page()
+        self.set_font(self.font_name, "", self.table_font_size)
+        half = self.epw / 2 - 2
+        widths = [half * 0.6, half * 0.4]
+        top = self.y
+        left = self._block(self.l_margin, top, texts["inputs"], widths, [
+            (labels.get(name, name), _format(values[name])) for name in INPUT_COLUMNS[1:]
+        ])
+        right = self._block(self.l_margin + half + 4, top, texts["outputs"], widths, [
+            (labels.get(name, name), _format(values[name])) for name in OUTPUT_COLUMNS
+        ])
+
+        y = self._block(
+            self.l_margin, max(left, right), texts["amortization"], [self.epw * 0.4, self.epw * 0.2, self.epw * 0.2,
+                                                                     self.epw * 0.2],
+            [(texts[name], *map(_format, row)) for name, row in amortization.items()],
+            header=[texts["method"], texts["monthly_payment"], texts["total_interest"], texts["total_paid"]],
+        )
+        years = int(values["years"])
+        self._block(
+            self.l_margin, y, texts["yearly"].format(method=texts[method]), [self.epw / 5] * 5,
+            [(str(year + 1), *(_format(yearly[name][year]) for name in ("payment", "principal", "interest", "balance")))
+             for year in range(years)],
+            header=[texts[name] for name in ("year", "payment", "principal", "interest", "balance")],
+        )
+
+    def _block(self, x, y, title, widths, rows, header=None):
+        # جدول صغير بخطوط أفقية فقط، مرسوم بـ text() مثل جدول الملخص بدل cell() لكل خلية
+        height = self.row_height
+        baseline = 0.5 * height + 0.3 * self.font_size
+        right = x + sum(widths)
+        self.set_font(style="B")
+        self.text(x, y + baseline, self._text(title))
+        y += height
+        if header:
+            self.set_fill_color(*self.header_fill)
+            self.rect(x, y, right - x, height, style="DF")
+            self._row(x, y + baseline, widths, header)
+            y += height
+        self.set_font(style="")
+        for row in rows:
+            if y + height > self.page_break_trigger:
+                # القروض الطويلة (أكثر من 25 سنة تقريبًا) تكمل جدولها في صفحة تالية برأس الجدول نفسه
+                self.add_page()
+                y = self.y
+                if header:
+                    self.set_font(style="B")
+                    self.rect(x, y, right - x, height, style="DF")
+                    self._row(x, y + baseline, widths, header)
+                    self.set_font(style="")
+                    y += height
+            self._row(x, y + baseline, widths, row)
+            y += height
+            self.line(x, y, right, y)
+        return y + height
+
+    def _row(self, x, baseline, widths, cells):
+        # الخلية الأولى نص بمحاذاة اليسار، والبقية أرقام بمحاذاة اليمين
+        for number, (text, width) in enumerate(zip(cells, widths)):
+            text = self._text(text)
+            offset = self.c_margin if number == 0 else width - self.c_margin - self.get_string_width(text)
+            self.text(x + offset, baseline, text)
+            x += width
+
+
+class PDFConcatenator:
+    # دمج ملفات PDF التي ينتجها fpdf2 (جدول xref عادي بلا تشفير ولا object streams) في ملف واحد يُكتب تدريجيًا:
+    # كائنات كل ملف تُنسخ بأرقام جديدة فور وصوله، ولا يبقى في الذاكرة إلا مواقع الكائنات وأرقام الصفحات
+    def __init__(self, target):
+        self.target = target
+        self.position = 0
+        # الكائن 1 شجرة الصفحات والكائن 2 الفهرس، ويُكتبان عند الإغلاق
+        self.offsets = [None, None]
+        self.kids = []
+        self.media_box = b"/MediaBox [0 0 595.28 841.89]"
+
+    def _write(self, data):
+        self.target.write(data)
+        self.position += len(data)
+
+    def append(self, data):
+        objects, root, info = _pdf_objects(data)
+        pages = int(_REFERENCE.search(objects[root].split(b"/Pages ", 1)[1]).group(1))
+        if not self.position:
+            self._write(data[:data.index(b"\n", data.index(b"\n") + 1) + 1])
+            self.media_box = re.search(rb"/MediaBox \[[^\]]*\]", objects[pages]).group()
+
+        numbers = {pages: 1}
+        next_number = len(self.offsets) + 1
+        for number in objects:
+            if number not in (root, info, pages):
+                numbers[number] = next_number
+                next_number += 1
+
+        def renumber(match):
+            return b"%d 0 R" % numbers[int(match.group(1))]
+
+        kids = objects[pages].split(b"/Kids [", 1)[1].split(b"]", 1)[0]
+        self.kids.extend(numbers[int(number)] for number in _REFERENCE.findall(kids))
+        for number in sorted(numbers, key=numbers.get)[1:]:
+            # المراجع تُعدل في قاموس الكائن فقط؛ بيانات stream تُنسخ كما هي
+            head, stream, rest = objects[number].partition(b"stream\n")
+            self.offsets.append(self.position)
+            self._write(b"%d 0 obj\n" % numbers[number] + _REFERENCE.sub(renumber, head) + stream + rest)
+
+    def close(self):
+        if not self.position:
+            self._write(b"%PDF-1.3\n")
+        self.offsets[0] = self.position
+        kids = b" ".join(b"%d 0 R" % number for number in self.kids)
+        self._write(b"1 0 obj\n<<\n/Count %d\n/Kids [%s]\n%s\n/Type /Pages\n>>\nendobj\n"
+                    % (len(self.kids), kids, self.media_box))
+        self.offsets[1] = self.position
+        self._write(b"2 0 obj\n<<\n/Pages 1 0 R\n/Type /Catalog\n>>\nendobj\n")
+
+        xref = self.position
+        size = len(self.offsets) + 1
+        entries = b"".join(b"%010d 00000 n \n" % offset for offset in self.offsets)
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n%s" % (size, entries))
+        self._write(b"trailer\n<<\n/Size %d\n/Root 2 0 R\n>>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+
+
+def _pdf_objects(data):
+    # محتوى كل كائن من جدول xref (مواقع دقيقة دون البحث داخل بيانات stream)، ورقما الفهرس والمعلومات
+    xref = int(re.search(rb"startxref\s+(\d+)", data[data.rindex(b"startxref"):]).group(1))
+    table, trailer = data[xref:].split(b"trailer", 1)
+    offsets = sorted(
+        (int(offset), number)
+        for number, (offset, kind) in enumerate(re.findall(rb"(\d{10}) \d{5} ([nf])", table))
+        if kind == b"n"
+    )
+    objects = {}
+    for (offset, number), end in zip(offsets, [*(offset for offset, _ in offsets[1:]), xref]):
+        body = data[offset:end]
+        objects[number] = body[body.index(b"obj") + 3:].lstrip(b"\r\n")
+    root = int(re.search(rb"/Root (\d+) 0 R", trailer).group(1))
+    info = re.search(rb"/Info (\d+) 0 R", trailer)
+    return objects, root, int(info.group(1)) if info else None
+
+
+def _format(value):
+    if isinstance(value, (float, np.floating)):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def _yearly(columns, method):
+    # تجميع الجدول الشهري لكل عقار إلى سنوات: مجموع الدفعات والرصيد في نهاية كل سنة
+    result = schedule(columns["net_value"], columns["interest_rate"], columns["years"], method)
+    shape = (len(result["payment"]), result["payment"].shape[1] // 12, 12)
+    yearly = {name: result[name].reshape(shape).sum(axis=2) for name in ("payment", "principal", "interest")}
+    yearly["balance"] = result["balance"][:, 11::12]
+    return yearly
+
+
+def _render_chunk(ids, columns, labels, settings, method, split):
+    # تعمل داخل عملية منفصلة: ملف PDF واحد للدفعة كلها، أو ملف لكل عقار عند التجميع في ZIP
+    loan = columns["net_value"], columns["interest_rate"], columns["years"]
+    amortization = {}
+    for name in METHODS:
+        payment = monthly_payment(*loan, name)
+        interest = total_interest(*loan, name)
+        amortization[name] = payment, interest, loan[0] + interest
+    yearly = _yearly(columns, method)
+
+    pdf = None
+    files = []
+    for row, record_id in enumerate(ids):
+        if pdf is None:
+            pdf = DetailPDF(**settings)
+        pdf.property_page(
+            record_id,
+            {name: columns[name][row] for name in COLUMNS},
+            {name: values[row] for name, values in yearly.items()},
+            {name: [values[row] for values in results] for name, results in amortization.items()},
+            labels,
+            method,
+        )
+        if split:
+            files.append((record_id, bytes(pdf.output())))
+            pdf = None
+    return len(ids), files if split else bytes(pdf.output())
+
+
+def iter_rendered(frames, labels=None, settings=DETAIL_REPORT, method="flat", split=False, workers=None,
+                  chunk_size=CHUNK_SIZE):
+    # توزيع دفعات صغيرة على مجمع عمليات مع حد للدفعات المعلقة، وإرجاع النتائج بالترتيب فور جاهزيتها
+    labels = labels or {}
+    tasks = (
+        (frame.index[start:start + chunk_size].to_numpy(),
+         {name: frame[name].to_numpy()[start:start + chunk_size] for name in COLUMNS},
+         labels, settings, method, split)
+        for frame in frames
+        for start in range(0, len(frame), chunk_size)
+    )
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            yield _render_chunk(*task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_render_chunk, *task))
+            if len(pending) >= workers * MAX_PENDING:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+@lru_cache(maxsize=None)
+def _spool_dir():
+    path = tempfile.mkdtemp(prefix="real_estate_reports_")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def spool_path(fmt):
+    # ملف مؤقت على القرص تُكتب فيه التقارير الكبيرة بدل الذاكرة، ويُحذف المجلد كله عند انتهاء العملية
+    handle, path = tempfile.mkstemp(suffix=f".{fmt}", dir=_spool_dir())
+    os.close(handle)
+    return path
+
+
+def write_detail_reports(target, frames, fmt="pdf", labels=None, settings=DETAIL_REPORT, method="flat",
+                         workers=None, progress=None):
+    # كتابة صفحات العقارات فور وصول كل دفعة: في ملف PDF مدموج أو أرشيف ZIP فيه ملف لكل عقار
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    split = fmt == "zip"
+    # ملفات PDF مضغوطة أصلًا، فتُخزن في الأرشيف دون ضغط إضافي
+    output = zipfile.ZipFile(target, "w", zipfile.ZIP_STORED) if split else PDFConcatenator(target)
+    done = 0
+    try:
+        for count, result in iter_rendered(frames, labels, settings, method, split, workers):
+            if split:
+                for record_id, data in result:
+                    output.writestr(f"property_{record_id}.pdf", data)
+            else:
+                output.append(result)
+            done += count
+            if progress is not None:
+                progress(done)
+    finally:
+        # إغلاق الأرشيف قبل إغلاق الملف حتى مع الخطأ، وإلا حاول ZipFile الكتابة في ملف مغلق عند حذفه
+        output.close()
+    return done
@@ -0,0 +1,47 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from real_estate_amortization import monthly_payment, total_interest
+from real_estate_engine import INTEREST_RATES, LOAN_YEARS, calculate
+from real_estate_pdf import LANDSCAPE_COMPACT_REPORT, render_pdf
+
+METRICS = ["monthly_payment", "total_interest", "rent_coverage"]
+
+
+def sensitivity_grid(price, down_payment, rental_percent, rates=INTEREST_RATES, years=LOAN_YEARS, method="flat"):
+    # حساب شبكة (الفائدة × المدة) كاملة بعملية بث واحدة بدلًا من إدخال كل تركيبة على حدة
+    rate_axis = np.asarray(rates, dtype=np.float64)[:, None]
+    year_axis = np.asarray(years, dtype=np.int64)[None, :]
+    result = calculate(price, down_payment, rate_axis, year_axis, rental_percent)
+    if method != "flat":
+        net_value = result["net_value"]
+        result["monthly_payment"] = monthly_payment(net_value, rate_axis, year_axis, method)
+        result["total_interest"] = total_interest(net_value, rate_axis, year_axis, method)
+
+    shape = (len(rates), len(years))
+    payment = np.broadcast_to(result["monthly_payment"], shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = np.where(payment > 0, result["rent_value"] / 12 / payment, np.nan)
+    return {
+        "monthly_payment": payment,
+        "total_interest": np.broadcast_to(result["total_interest"], shape),
+        "rent_coverage": np.broadcast_to(coverage, shape),
+    }
+
+
+@lru_cache(maxsize=256)
+def sensitivity_frames(price, down_payment, rental_percent, method="flat"):
+    # جداول الشبكة محفوظة لكل مدخلات عقار حتى تعود فورًا عند التكرار
+    grid = sensitivity_grid(price, down_payment, rental_percent, method=method)
+    index = pd.Index(INTEREST_RATES, name="interest_rate")
+    columns = pd.Index(LOAN_YEARS, name="years")
+    return {metric: pd.DataFrame(values, index=index, columns=columns) for metric, values in grid.items()}
+
+
+@lru_cache(maxsize=32)
+def sensitivity_pdf(price, down_payment, rental_percent, method, metric):
+    grid = sensitivity_frames(price, down_payment, rental_percent, method)[metric].reset_index()
+    grid.columns = [str(col) for col in grid.columns]
+    return render_pdf(grid, {**LANDSCAPE_COMPACT_REPORT, "title": f"Rate x Term Sensitivity: {metric}"})
@@ -0,0 +1,281 @@
+import argparse
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from real_estate_engine import COLUMNS, INPUT_COLUMNS, calculate, invalid_down_payment
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH = 4096
+MAX_DELAY = 0.002
+MAX_BODY = 64 * 1024 * 1024
+PDF_WORKERS = 2
+PDF_QUEUE = 8
+DEFAULT_RENTAL_PERCENT = 5.0
+JSON = "application/json"
+NUMBER_FIELDS = ["price", "down_payment", "interest_rate", "rental_percent"]
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(item, name, default=None):
+    # JSON يقبل true/false كأرقام في float() و int()، فتُرفض القيم المنطقية صراحة
+    value = item[name] if default is None else item.get(name, default)
+    if isinstance(value, bool):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be a number.")
+    return float(value)
+
+
+def parse_property(item):
+    # التحقق من مدخلات عقار واحد قبل دخوله إلى الدفعة بنفس قواعد الاستيراد
+    if not isinstance(item, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Each property must be a JSON object.")
+    try:
+        row = {
+            "property_type": str(item["property_type"]),
+            "price": _number(item, "price"),
+            "down_payment": _number(item, "down_payment"),
+            "interest_rate": _number(item, "interest_rate"),
+            "years": _number(item, "years"),
+            "rental_percent": _number(item, "rental_percent", DEFAULT_RENTAL_PERCENT),
+        }
+        years = int(row["years"])
+    except KeyError as error:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Missing field: {error.args[0]}")
+    except (TypeError, ValueError, OverflowError) as error:
+        # OverflowError من int() لقيم مثل 1e400 التي يقرؤها json كـ inf
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid value: {error}")
+    for name in NUMBER_FIELDS:
+        if not math.isfinite(row[name]):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be a finite number.")
+        if row[name] < 0:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} cannot be negative.")
+    # المدة عدد صحيح من السنوات: 2.7 كانت تُقص إلى 2 بصمت
+    if years != row["years"]:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "years must be a whole number.")
+    if years < 1:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "years must be at least 1.")
+    row["years"] = years
+    if invalid_down_payment(row["price"], row["down_payment"]):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Down payment cannot exceed property price.")
+    return row
+
+
+def price_rows(rows):
+    # حساب قائمة عقارات بعملية متجهة واحدة وإرجاع النتائج كقواميس JSON
+    inputs = {name: [row[name] for row in rows] for name in INPUT_COLUMNS}
+    result = calculate(*(np.asarray(inputs[name]) for name in INPUT_COLUMNS[1:]))
+    columns = {**inputs, **{name: values.tolist() for name, values in result.items()}}
+    return [dict(zip(COLUMNS, values)) for values in zip(*(columns[name] for name in COLUMNS))]
+
+
+class MicroBatcher:
+    # تجميع الطلبات الفردية المتزامنة في دفعة واحدة قبل الحساب
+    def __init__(self, max_batch=MAX_BATCH, max_delay=MAX_DELAY):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.items = 0
+        self._queue = asyncio.Queue()
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    def _drain(self, pending):
+        while len(pending) < self.max_batch and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+
+    async def run(self):
+        while True:
+            pending = [await self._queue.get()]
+            self._drain(pending)
+            if len(pending) < self.max_batch and self.max_delay:
+                await asyncio.sleep(self.max_delay)
+                self._drain(pending)
+
+            self.batches += 1
+            self.items += len(pending)
+            try:
+                results = price_rows([row for row, _ in pending])
+            except Exception as error:
+                # خطأ في الدفعة يصل إلى كل طلباتها بدل إيقاف المجمّع وترك الطلبات معلقة
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class CalculationService:
+    # خدمة HTTP محلية مبنية على asyncio فوق نفس معادلات الحاسبة
+    def __init__(self, pdf_workers=PDF_WORKERS, pdf_queue=PDF_QUEUE, **batch_options):
+        self.batcher = MicroBatcher(**batch_options)
+        self._pdf_pool = ThreadPoolExecutor(max_workers=pdf_workers, thread_name_prefix="pdf-report")
+        self._pdf_slots = asyncio.Semaphore(pdf_workers + pdf_queue)
+        self._batch_task = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._batch_task = asyncio.create_task(self.batcher.run())
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def close(self):
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+        self._pdf_pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = await self._read_headers(reader)
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large."})
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload, content_type = await self._dispatch(method, target, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, content_type, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_headers(self, reader):
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _respond(self, writer, status, payload, content_type=JSON, keep_alive=True):
+        if content_type == JSON and not isinstance(payload, bytes):
+            payload = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        routes = {
+            ("GET", "/health"): self._health,
+            ("POST", "/calculate"): self._calculate,
+            ("POST", "/calculate/batch"): self._calculate_batch,
+            ("POST", "/report"): self._report,
+        }
+        handler = routes.get((method, url.path))
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {url.path}"}, JSON
+        try:
+            payload = json.loads(body) if body else None
+            status, payload, content_type = await handler(payload, parse_qs(url.query))
+            if content_type == JSON:
+                # الترميز هنا حتى تصل أي قيمة غير منتهية في النتيجة إلى معالج الأخطاء بدل قطع الاتصال
+                payload = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8")
+            return status, payload, content_type
+        except json.JSONDecodeError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {error}"}, JSON
+        except RequestError as error:
+            return error.status, {"error": str(error)}, JSON
+        except Exception as error:
+            # أي خطأ غير متوقع يعود كخطأ 500 بصيغة JSON بدل إغلاق الاتصال دون رد
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Internal error: {error}"}, JSON
+
+    async def _health(self, payload, query):
+        stats = {"status": "ok", "batches": self.batcher.batches, "items": self.batcher.items}
+        return HTTPStatus.OK, stats, JSON
+
+    async def _calculate(self, payload, query):
+        return HTTPStatus.OK, await self.batcher.submit(parse_property(payload)), JSON
+
+    async def _calculate_batch(self, payload, query):
+        if not isinstance(payload, list):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Expected a JSON list of properties.")
+        rows = [parse_property(item) for item in payload]
+        return HTTPStatus.OK, price_rows(rows) if rows else [], JSON
+
+    async def _report(self, payload, query):
+        # عدد محدود من تقارير PDF قيد التنفيذ أو الانتظار؛ ما زاد يُرفض بدل أن يتراكم
+        from real_estate_pdf import ARABIC_REPORT, LANDSCAPE_REPORT, PORTRAIT_REPORT, fit_font
+
+        if not isinstance(payload, list) or not payload:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Expected a non-empty JSON list of properties.")
+        if self._pdf_slots.locked():
+            raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many reports in progress.")
+        layouts = {"portrait": PORTRAIT_REPORT, "landscape": LANDSCAPE_REPORT, "arabic": ARABIC_REPORT}
+        settings = layouts.get(query.get("layout", ["landscape"])[0], LANDSCAPE_REPORT)
+        frame = pd.DataFrame(price_rows([parse_property(item) for item in payload]), columns=COLUMNS)
+        settings = fit_font(settings, frame["property_type"])
+        async with self._pdf_slots:
+            data = await asyncio.get_running_loop().run_in_executor(self._pdf_pool, render_report, frame, settings)
+        return HTTPStatus.OK, data, "application/pdf"
+
+
+def render_report(frame, settings):
+    from real_estate_cache import report_cache, report_key
+    from real_estate_pdf import render_pdf
+
+    key = report_key(frame, settings)
+    data = report_cache.get(key)
+    if data is None:
+        data = render_pdf(frame, settings)
+        report_cache.put(key, data)
+    return data
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    service = CalculationService(**options)
+    server = await service.start(host, port)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP service for real estate purchase calculations.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-delay", type=float, default=MAX_DELAY, help="seconds to wait to fill a batch")
+    parser.add_argument("--pdf-workers", type=int, default=PDF_WORKERS)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, max_batch=args.max_batch, max_delay=args.max_delay,
+                          pdf_workers=args.pdf_workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
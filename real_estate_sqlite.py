@@ -0,0 +1,239 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from real_estate_engine import COLUMNS, INPUT_COLUMNS, calculate
+from real_estate_store import input_key
+from real_estate_summary import SUMMED_COLUMNS, PortfolioTotals
+
+INDEXED_COLUMNS = ["property_type", "price", "monthly_payment"]
+COLUMN_TYPES = {"property_type": "TEXT NOT NULL", "years": "INTEGER NOT NULL"}
+
+
+class SQLiteRecordStore:
+    # مخزن دائم اختياري في SQLite بنفس واجهة RecordStore، يحمّل فقط الصفوف التي تحتاجها الواجهة
+    # الملف مخزن واحد مشترك: كل الجلسات والمستخدمين على نفس المسار يرون الصفوف نفسها، وclear() يحذفها للجميع
+    def __init__(self, path, property_types):
+        self.path = path
+        self.property_types = list(property_types)
+        self._writes = 0
+        self._frames = {}
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._load_property_types()
+        self.totals = PortfolioTotals()
+        self._load_totals()
+
+    def _create_schema(self):
+        columns = ", ".join(f"{name} {COLUMN_TYPES.get(name, 'REAL NOT NULL')}" for name in COLUMNS)
+        with self._connection:
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY, {columns})")
+            for name in INDEXED_COLUMNS:
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS idx_records_{name} ON records ({name})")
+            # فهرس على كل المدخلات لكشف التكرار
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_records_inputs ON records ({', '.join(INPUT_COLUMNS)})"
+            )
+
+    def _load_property_types(self):
+        for (name,) in self._execute("SELECT DISTINCT property_type FROM records"):
+            if name not in self.property_types:
+                self.property_types.append(name)
+
+    def _load_totals(self):
+        # المجاميع تُبنى مرة واحدة عند الفتح بـ GROUP BY ثم تُحدَّث مع كل إضافة
+        self.totals.clear()
+        sums = ", ".join(f"SUM({name})" for name in SUMMED_COLUMNS)
+        rows = self._execute(f"SELECT property_type, COUNT(*), {sums} FROM records GROUP BY property_type")
+        self._totals_data_version = self._execute("PRAGMA data_version")[0][0]
+        if not rows:
+            return
+        self._load_property_types()
+        types, counts, *columns = zip(*rows)
+        codes = [self.property_types.index(name) for name in types]
+        self.totals.add(codes, dict(zip(SUMMED_COLUMNS, map(np.asarray, columns))), counts)
+
+    def _execute(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def __len__(self):
+        return self._execute("SELECT COUNT(*) FROM records")[0][0]
+
+    @property
+    def version(self):
+        # data_version يتغير عندما تكتب اتصالات أخرى (جلسات أو عمليات أخرى) في نفس الملف
+        return self._writes, self._execute("PRAGMA data_version")[0][0]
+
+    @property
+    def nbytes(self):
+        # حجم قاعدة البيانات على القرص؛ الصفوف لا تبقى في الذاكرة
+        page_count = self._execute("PRAGMA page_count")[0][0]
+        return page_count * self._execute("PRAGMA page_size")[0][0]
+
+    def _changed(self):
+        self._writes += 1
+        self._frames.clear()
+
+    def append(self, property_type, price, down_payment, interest_rate, years, rental_percent):
+        # إضافة عقار واحد وإرجاع معرّفه الذي أعطته له SQLite
+        inputs = {
+            "property_type": [property_type],
+            "price": [price],
+            "down_payment": [down_payment],
+            "interest_rate": [interest_rate],
+            "years": [years],
+            "rental_percent": [rental_percent],
+        }
+        inputs.update(calculate(*(inputs[name] for name in INPUT_COLUMNS[1:])))
+        return self._insert(inputs, single=True)
+
+    def extend(self, frame):
+        # إدراج الدفعة كاملة في معاملة واحدة
+        if not len(frame["price"]):
+            return
+        self._insert(frame)
+
+    def _insert(self, frame, single=False):
+        values = {name: np.asarray(frame[name]) for name in COLUMNS}
+        types = pd.Series(values["property_type"], dtype="string")
+        self.property_types.extend(value for value in types.dropna().unique() if value not in self.property_types)
+
+        rows = zip(
+            types.tolist(),
+            *(values[name].astype(np.int64 if name == "years" else np.float64).tolist() for name in COLUMNS[1:]),
+        )
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        sql = f"INSERT INTO records ({', '.join(COLUMNS)}) VALUES ({placeholders})"
+        with self._lock, self._connection:
+            if single:
+                # lastrowid صالح مع execute لصف واحد فقط، لا مع executemany
+                record_id = self._connection.execute(sql, next(rows)).lastrowid
+            else:
+                record_id = None
+                self._connection.executemany(sql, rows)
+        codes = pd.Categorical(types, categories=self.property_types).codes
+        self.totals.add(codes, values)
+        self._changed()
+        return record_id
+
+    def _row_totals(self, row):
+        return [self.property_types.index(row["property_type"])], {name: [row[name]] for name in SUMMED_COLUMNS}
+
+    def find(self, property_type, price, down_payment, interest_rate, years, rental_percent):
+        # معرّف عقار مطابق في كل المدخلات عبر فهرس idx_records_inputs، أو None
+        where = " AND ".join(f"{name} = ?" for name in INPUT_COLUMNS)
+        key = input_key(property_type, price, down_payment, interest_rate, years, rental_percent)
+        rows = self._execute(f"SELECT id FROM records WHERE {where} ORDER BY id LIMIT 1", key)
+        return rows[0][0] if rows else None
+
+    def first_id(self):
+        return self._execute("SELECT MIN(id) FROM records")[0][0]
+
+    def update(self, record_id, property_type, price, down_payment, interest_rate, years, rental_percent):
+        old = self.record(record_id)
+        if old is None:
+            raise KeyError(f"No record with id {record_id}")
+        if property_type not in self.property_types:
+            self.property_types.append(property_type)
+        inputs = input_key(property_type, price, down_payment, interest_rate, years, rental_percent)
+        values = dict(zip(INPUT_COLUMNS, inputs))
+        values.update({name: float(value) for name, value in calculate(*inputs[1:]).items()})
+        assignments = ", ".join(f"{name} = ?" for name in COLUMNS)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"UPDATE records SET {assignments} WHERE id = ?", [*(values[name] for name in COLUMNS), int(record_id)]
+            )
+        self.totals.remove(*self._row_totals(old))
+        self.totals.add(*self._row_totals(values))
+        self._changed()
+
+    def delete(self, record_id):
+        old = self.record(record_id)
+        if old is None:
+            raise KeyError(f"No record with id {record_id}")
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM records WHERE id = ?", (int(record_id),))
+        self.totals.remove(*self._row_totals(old))
+        self._changed()
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM records")
+        self.totals.clear()
+        self._changed()
+
+    def _query_frame(self, sql, parameters=(), labels=None):
+        labels = labels or {}
+        rows = self._execute(sql, parameters)
+        data = {name: [] for name in ["id", *COLUMNS]} if not rows else dict(zip(["id", *COLUMNS], zip(*rows)))
+        frame = pd.DataFrame({labels.get(name, name): values for name, values in data.items() if name != "id"})
+        frame[labels.get("property_type", "property_type")] = pd.Categorical(
+            data["property_type"], categories=self.property_types
+        )
+        frame.index = pd.Index(np.asarray(data["id"], dtype=np.int64), name="#")
+        return frame
+
+    def frame(self, labels=None):
+        labels = labels or {}
+        key = (self.version, tuple(labels.get(name, name) for name in COLUMNS))
+        if key not in self._frames:
+            self._frames.clear()
+            self._frames[key] = self._query_frame(f"SELECT id, {', '.join(COLUMNS)} FROM records ORDER BY id", labels=labels)
+        return self._frames[key]
+
+    def column(self, name):
+        return self.frame()[name].to_numpy()
+
+    def _where(self, property_types, search):
+        clauses, parameters = [], []
+        if property_types:
+            clauses.append(f"property_type IN ({', '.join('?' for _ in property_types)})")
+            parameters.extend(property_types)
+        if search:
+            clauses.append("property_type LIKE ?")
+            parameters.append(f"%{search.strip()}%")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), parameters
+
+    def page(self, start, size, sort_by=None, ascending=True, property_types=None, search=None, labels=None):
+        # البحث والتصفية والترتيب والتقسيم إلى صفحات تتم في SQLite باستخدام الفهارس
+        if sort_by is not None and sort_by not in COLUMNS:
+            raise ValueError(f"Unknown column: {sort_by}")
+        where, parameters = self._where(property_types, search)
+        order = f"{sort_by} {'ASC' if ascending else 'DESC'}, id" if sort_by else "id"
+        matches = self._execute(f"SELECT COUNT(*) FROM records{where}", parameters)[0][0]
+        frame = self._query_frame(
+            f"SELECT id, {', '.join(COLUMNS)} FROM records{where} ORDER BY {order} LIMIT ? OFFSET ?",
+            [*parameters, size, start],
+            labels,
+        )
+        return frame, matches
+
+    def summary(self, total_label=None, labels=None):
+        # إعادة البناء فقط إذا كتبت اتصالات أخرى في نفس الملف منذ آخر تحميل
+        if self._execute("PRAGMA data_version")[0][0] != self._totals_data_version:
+            self._load_totals()
+        return self.totals.frame(self.property_types, total_label, labels)
+
+    def iter_frames(self, chunk_size, labels=None):
+        # قراءة الجدول على دفعات بالمعرّف حتى لا يُحمَّل كاملًا في الذاكرة
+        last_id = 0
+        while True:
+            frame = self._query_frame(
+                f"SELECT id, {', '.join(COLUMNS)} FROM records WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk_size),
+                labels,
+            )
+            if frame.empty:
+                return
+            yield frame
+            last_id = int(frame.index[-1])
+
+    def record(self, record_id):
+        rows = self._execute(f"SELECT {', '.join(COLUMNS)} FROM records WHERE id = ?", (int(record_id),))
+        return dict(zip(COLUMNS, rows[0])) if rows else None
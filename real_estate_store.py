@@ -0,0 +1,334 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from real_estate_engine import COLUMNS, INPUT_COLUMNS, calculate
+from real_estate_summary import PortfolioTotals
+
+FLOAT_COLUMNS = [name for name in COLUMNS if name not in ("property_type", "years")]
+INITIAL_CAPACITY = 1024
+DATABASE_ENV = "REAL_ESTATE_DB"
+
+
+def input_key(property_type, price, down_payment, interest_rate, years, rental_percent):
+    # مفتاح فهرس التكرار: مدخلات العقار بعد توحيد أنواعها
+    return (
+        str(property_type), float(price), float(down_payment), float(interest_rate), int(years), float(rental_percent)
+    )
+
+
+class RecordStore:
+    # مخزن عمودي بمخطط ثابت بدلًا من قائمة القواميس في الجلسة
+    def __init__(self, property_types, capacity=INITIAL_CAPACITY):
+        self.property_types = list(property_types)
+        self.size = 0
+        self.version = 0
+        self._frames = {}
+        self._selections = {}
+        self._allocate(capacity)
+        # _positions يحول المعرّف إلى رقم الصف الحالي (-1 للمحذوف)
+        self._positions = np.full(capacity + 1, -1, dtype=np.int64)
+        self.next_id = 1
+        self._input_index = None
+        self.totals = PortfolioTotals()
+
+    def _allocate(self, capacity):
+        self._type_codes = np.empty(capacity, dtype=np.int16)
+        self._years = np.empty(capacity, dtype=np.int64)
+        self._floats = {name: np.empty(capacity, dtype=np.float64) for name in FLOAT_COLUMNS}
+        # معرّفات ثابتة لا يعاد استخدامها
+        self._ids = np.empty(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self._years)
+
+    @property
+    def nbytes(self):
+        # الذاكرة المحجوزة لكل الأعمدة بما فيها السعة غير المستخدمة بعد
+        arrays = [self._type_codes, self._years, self._ids, self._positions, *self._floats.values()]
+        return sum(values.nbytes for values in arrays)
+
+    def _reserve(self, extra):
+        # مضاعفة السعة عند الحاجة حتى تبقى الإضافة بتكلفة ثابتة في المتوسط
+        needed = self.size + extra
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        self._type_codes = self._grow(self._type_codes, capacity)
+        self._years = self._grow(self._years, capacity)
+        self._ids = self._grow(self._ids, capacity)
+        self._floats = {name: self._grow(values, capacity) for name, values in self._floats.items()}
+
+    def _grow(self, values, capacity):
+        grown = np.empty(capacity, dtype=values.dtype)
+        grown[:self.size] = values[:self.size]
+        return grown
+
+    def _grow_positions(self, size):
+        if size <= len(self._positions):
+            return
+        grown = np.full(max(size, 2 * len(self._positions)), -1, dtype=np.int64)
+        grown[:len(self._positions)] = self._positions
+        self._positions = grown
+
+    def _type_code_array(self, property_types):
+        # تحويل نوع العقار إلى رمز فئوي مع إضافة الأنواع الجديدة عند الاستيراد
+        if len(property_types) == 1:
+            # عقار واحد من النموذج: بحث مباشر في القائمة بدل بناء Categorical لصف واحد
+            value = np.asarray(property_types, dtype=object)[0]
+            if pd.isna(value):
+                return np.array([-1], dtype=np.int16)
+            if str(value) not in self.property_types:
+                self.property_types.append(str(value))
+            return np.array([self.property_types.index(str(value))], dtype=np.int16)
+        property_types = pd.Series(property_types, dtype="string")
+        new_types = [value for value in property_types.dropna().unique() if value not in self.property_types]
+        self.property_types.extend(new_types)
+        return pd.Categorical(property_types, categories=self.property_types).codes
+
+    def append(self, property_type, price, down_payment, interest_rate, years, rental_percent):
+        # إضافة عقار واحد كدفعة بحجم واحد عبر محرك الحساب، وإرجاع معرّفه الجديد
+        inputs = {
+            "property_type": [property_type],
+            "price": [price],
+            "down_payment": [down_payment],
+            "interest_rate": [interest_rate],
+            "years": [years],
+            "rental_percent": [rental_percent],
+        }
+        inputs.update(calculate(*(inputs[name] for name in INPUT_COLUMNS[1:])))
+        self.extend(inputs)
+        return int(self._ids[self.size - 1])
+
+    def extend(self, frame):
+        # إضافة دفعة محسوبة مسبقًا (DataFrame أو قاموس مصفوفات) بكل أعمدة COLUMNS
+        count = len(frame["price"])
+        if not count:
+            return
+        self._reserve(count)
+        start, end = self.size, self.size + count
+        self._type_codes[start:end] = self._type_code_array(frame["property_type"])
+        self._years[start:end] = frame["years"]
+        for name, values in self._floats.items():
+            values[start:end] = frame[name]
+        ids = np.arange(self.next_id, self.next_id + count)
+        self._ids[start:end] = ids
+        self.next_id += count
+        self._grow_positions(self.next_id)
+        self._positions[ids] = np.arange(start, end)
+        self.size = end
+
+        self.totals.add(*self._row_totals(start, end))
+        if self._input_index is not None:
+            # إضافة من النموذج تحدّث الفهرس مباشرة، والاستيراد الكبير يؤجل بناءه إلى أول بحث
+            if count == 1:
+                self._input_index.setdefault(self._row_key(start), []).append(int(ids[0]))
+            else:
+                self._input_index = None
+        self._changed()
+
+    def _row_totals(self, start, end):
+        return self._type_codes[start:end], {name: values[start:end] for name, values in self._floats.items()}
+
+    def _row_key(self, position):
+        code = self._type_codes[position]
+        return input_key(
+            self.property_types[code] if code >= 0 else "",
+            *(self._floats[name][position] for name in ("price", "down_payment", "interest_rate")),
+            self._years[position],
+            self._floats["rental_percent"][position],
+        )
+
+    def _build_input_index(self):
+        # فهرس تجزئة من مدخلات العقار إلى معرّفاته، يُبنى مرة ثم يُحدَّث مع كل إضافة أو تعديل أو حذف
+        types = np.array([*self.property_types, ""], dtype=object)[self._type_codes[:self.size]]
+        columns = [types.tolist(), *(self.column(name).tolist() for name in INPUT_COLUMNS[1:])]
+        index = {}
+        for record_id, key in zip(self._ids[:self.size].tolist(), zip(*columns)):
+            index.setdefault(key, []).append(record_id)
+        self._input_index = index
+
+    def find(self, property_type, price, down_payment, interest_rate, years, rental_percent):
+        # معرّف عقار مطابق في كل المدخلات، أو None
+        if self._input_index is None:
+            self._build_input_index()
+        ids = self._input_index.get(input_key(property_type, price, down_payment, interest_rate, years, rental_percent))
+        return ids[0] if ids else None
+
+    def _index_remove(self, key, record_id):
+        if self._input_index is None:
+            return
+        ids = self._input_index[key]
+        ids.remove(record_id)
+        if not ids:
+            del self._input_index[key]
+
+    def position(self, record_id):
+        record_id = int(record_id)
+        if 0 < record_id < len(self._positions) and self._positions[record_id] >= 0:
+            return int(self._positions[record_id])
+        return None
+
+    def _require(self, record_id):
+        position = self.position(record_id)
+        if position is None:
+            raise KeyError(f"No record with id {record_id}")
+        return position
+
+    def first_id(self):
+        return int(self._ids[0]) if self.size else None
+
+    def update(self, record_id, property_type, price, down_payment, interest_rate, years, rental_percent):
+        # تعديل عقار في مكانه: حساب صف واحد وتعديل المجاميع والفهرس دون إعادة بناء المصفوفات
+        position = self._require(record_id)
+        self.totals.remove(*self._row_totals(position, position + 1))
+        self._index_remove(self._row_key(position), record_id)
+
+        values = {
+            "price": price,
+            "down_payment": down_payment,
+            "interest_rate": interest_rate,
+            "rental_percent": rental_percent,
+            **calculate(price, down_payment, interest_rate, years, rental_percent),
+        }
+        self._type_codes[position] = self._type_code_array([property_type])[0]
+        self._years[position] = years
+        for name, column in self._floats.items():
+            column[position] = values[name]
+
+        self.totals.add(*self._row_totals(position, position + 1))
+        if self._input_index is not None:
+            self._input_index.setdefault(self._row_key(position), []).append(int(record_id))
+        self._changed()
+
+    def delete(self, record_id):
+        # حذف بنقل آخر صف إلى مكان الصف المحذوف: تكلفة ثابتة دون إزاحة بقية المصفوفات
+        position = self._require(record_id)
+        self.totals.remove(*self._row_totals(position, position + 1))
+        self._index_remove(self._row_key(position), record_id)
+
+        last = self.size - 1
+        if position != last:
+            moved = self._ids[last]
+            self._ids[position] = moved
+            self._type_codes[position] = self._type_codes[last]
+            self._years[position] = self._years[last]
+            for values in self._floats.values():
+                values[position] = values[last]
+            self._positions[moved] = position
+        self._positions[record_id] = -1
+        self.size = last
+        self._changed()
+
+    def clear(self):
+        self.size = 0
+        self._positions[:] = -1
+        self._input_index = {}
+        self.totals.clear()
+        self._changed()
+
+    def _changed(self):
+        # أي تغيير في البيانات يرفع رقم الإصدار ويلغي العروض المحفوظة
+        self.version += 1
+        self._frames.clear()
+        self._selections.clear()
+
+    def column(self, name):
+        # عرض مؤقت للقراءة داخل المخزن؛ ما يُسلَّم للخارج يمر عبر frame() أو take()
+        if name == "property_type":
+            return pd.Categorical.from_codes(self._type_codes[:self.size], categories=self.property_types)
+        if name == "years":
+            return self._years[:self.size]
+        return self._floats[name][:self.size]
+
+    def frame(self, labels=None):
+        # عرض DataFrame للقراءة فقط فوق المصفوفات نفسها دون نسخ، محفوظ لكل مجموعة أسماء حتى يتغير رقم الإصدار.
+        # التعديل والحذف يكتبان في مكانهما بتكلفة ثابتة، فالعرض صالح حتى أول كتابة فقط؛
+        # من يحتفظ به بعد ذلك ينسخه أولًا (تصدير PDF في الخلفية مثلًا)
+        labels = labels or {}
+        key = tuple(labels.get(name, name) for name in COLUMNS)
+        if key not in self._frames:
+            # نوع العقار يُبنى من الرموز كـ Categorical جديد، فالأعمدة الرقمية وحدها عروض
+            data = {
+                label: self.column(name) if name == "property_type" else _read_only(self.column(name))
+                for label, name in zip(key, COLUMNS)
+            }
+            index = pd.Index(_read_only(self._ids[:self.size]), name="#")
+            self._frames[key] = pd.DataFrame(data, index=index, copy=False)
+        return self._frames[key]
+
+    def select(self, sort_by=None, ascending=True, property_types=None, search=None):
+        # تنفيذ البحث والتصفية والترتيب داخل المخزن وإرجاع أرقام الصفوف فقط
+        key = (sort_by, ascending, tuple(property_types or ()), search or "")
+        if key in self._selections:
+            return self._selections[key]
+
+        codes = self._type_codes[:self.size]
+        mask = np.ones(self.size, dtype=bool)
+        if property_types:
+            allowed = [code for code, name in enumerate(self.property_types) if name in property_types]
+            mask &= np.isin(codes, allowed)
+        if search:
+            needle = search.strip().casefold()
+            matching = [code for code, name in enumerate(self.property_types) if needle in name.casefold()]
+            mask &= np.isin(codes, matching)
+        rows = np.flatnonzero(mask)
+
+        if sort_by:
+            values = codes if sort_by == "property_type" else self.column(sort_by)
+            order = np.argsort(values[rows], kind="stable")
+            rows = rows[order if ascending else order[::-1]]
+
+        self._selections[key] = rows
+        return rows
+
+    def take(self, rows, labels=None):
+        # نسخ الصفوف المطلوبة فقط (صفحة واحدة مثلًا) مع معرّفاتها
+        labels = labels or {}
+        data = {labels.get(name, name): self.column(name)[rows] for name in COLUMNS}
+        return pd.DataFrame(data, index=pd.Index(self._ids[rows], name="#"))
+
+    def page(self, start, size, sort_by=None, ascending=True, property_types=None, search=None, labels=None):
+        # صفحة واحدة من النتائج مع عدد الصفوف المطابقة
+        rows = self.select(sort_by, ascending, property_types, search)
+        return self.take(rows[start:start + size], labels), len(rows)
+
+    def summary(self, total_label=None, labels=None):
+        # ملخص المحفظة من المجاميع الجارية: تكلفته بعدد الأنواع لا بعدد العقارات
+        return self.totals.frame(self.property_types, total_label, labels)
+
+    def iter_frames(self, chunk_size, labels=None):
+        # دفعات متتالية للتصدير؛ كل دفعة عرض فوق المصفوفات نفسها دون نسخ
+        frame = self.frame(labels)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size]
+
+    def record(self, record_id):
+        # قيم عقار واحد كقاموس، أو None إذا لم يوجد المعرّف
+        position = self.position(record_id)
+        if position is None:
+            return None
+        return {name: self.column(name)[position] for name in COLUMNS}
+
+
+def _read_only(values):
+    # علم القراءة فقط على العرض وحده؛ المصفوفة الأصلية تبقى قابلة للكتابة داخل المخزن
+    values = values.view()
+    values.flags.writeable = False
+    return values
+
+
+def open_store(property_types):
+    # مخزن دائم في SQLite عند ضبط المتغير REAL_ESTATE_DB، وإلا مخزن في ذاكرة الجلسة
+    # قاعدة البيانات مشتركة بين كل الجلسات التي تفتح نفس الملف، وليست خاصة بجلسة واحدة
+    path = os.environ.get(DATABASE_ENV)
+    if path:
+        from real_estate_sqlite import SQLiteRecordStore
+
+        return SQLiteRecordStore(path, property_types)
+    return RecordStore(property_types)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+SUMMED_COLUMNS = ["price", "net_value", "total_interest", "monthly_payment", "rent_value"]
+SUMMARY_COLUMNS = [
+    "property_type",
+    "count",
+    "total_financed",
+    "total_interest",
+    "average_monthly_payment",
+    "rent_yield",
+]
+
+
+class PortfolioTotals:
+    # مجاميع جارية لكل نوع عقار (حسب رمزه في المخزن) تُحدّث مع كل إضافة بدل groupby على الجدول كله
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sums = {name: np.zeros(0) for name in SUMMED_COLUMNS}
+
+    def _resize(self, size):
+        if size <= len(self.counts):
+            return
+        self.counts = np.concatenate([self.counts, np.zeros(size - len(self.counts), dtype=np.int64)])
+        self.sums = {name: np.concatenate([values, np.zeros(size - len(values))]) for name, values in self.sums.items()}
+
+    def add(self, codes, columns, counts=None):
+        # codes رمز النوع لكل صف؛ ومع counts يمثل كل صف مجموعة جاهزة (نتيجة GROUP BY مثلًا)
+        codes = np.asarray(codes, dtype=np.int64)
+        valid = codes >= 0
+        if not valid.all():
+            codes = codes[valid]
+            columns = {name: np.asarray(columns[name])[valid] for name in SUMMED_COLUMNS}
+            counts = None if counts is None else np.asarray(counts)[valid]
+        if not len(codes):
+            return
+        size = max(len(self.counts), int(codes.max()) + 1)
+        self._resize(size)
+        self.counts += np.bincount(codes, weights=counts, minlength=size).astype(np.int64)
+        for name in SUMMED_COLUMNS:
+            self.sums[name] += np.bincount(codes, weights=columns[name], minlength=size)
+
+    def remove(self, codes, columns):
+        # عكس add عند تعديل عقار أو حذفه
+        self.add(codes, {name: -np.asarray(columns[name]) for name in SUMMED_COLUMNS}, -np.ones(len(codes)))
+
+    def frame(self, property_types, total_label=None, labels=None):
+        # صف لكل نوع فيه عقارات، وصف إجمالي للمحفظة عند تمرير total_label
+        present = np.flatnonzero(self.counts)
+        names = [property_types[code] for code in present]
+        counts = self.counts[present]
+        sums = {name: values[present] for name, values in self.sums.items()}
+        if total_label is not None and len(present):
+            names.append(total_label)
+            counts = np.append(counts, counts.sum())
+            sums = {name: np.append(values, values.sum()) for name, values in sums.items()}
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            data = {
+                "property_type": names,
+                "count": counts,
+                "total_financed": sums["net_value"],
+                "total_interest": sums["total_interest"],
+                "average_monthly_payment": sums["monthly_payment"] / counts,
+                "rent_yield": np.where(sums["price"] > 0, sums["rent_value"] / sums["price"] * 100, 0.0),
+            }
+        labels = labels or {}
+        return pd.DataFrame({labels.get(name, name): data[name] for name in SUMMARY_COLUMNS})
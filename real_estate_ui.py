@@ -0,0 +1,940 @@
+import functools
+import io
+import math
+import os
+import sys
+
+import altair as alt
+import streamlit as st
+
+from real_estate_affordability import affordability_chunks, affordability_frame
+from real_estate_amortization import METHODS, SCHEDULE_COLUMNS, schedule_frame
+from real_estate_cache import report_cache
+from real_estate_engine import COLUMNS, INTEREST_RATES, LOAN_YEARS
+from real_estate_export import CHUNK_SIZE, COMPRESSIONS, MIME_TYPES, WRITERS, export_buffer, export_file_name
+from real_estate_import import SUPPORTED_TYPES, import_chunks
+from real_estate_jobs import submit_export
+from real_estate_metrics import RerunMetrics, estimate_bytes, metrics_log_path
+from real_estate_optimizer import OBJECTIVES, optimize_portfolio
+from real_estate_reports import DETAIL_REPORT, REPORT_FORMATS, REPORT_MIME_TYPES, spool_path, write_detail_reports
+from real_estate_sensitivity import METRICS, sensitivity_frames, sensitivity_pdf
+from real_estate_simulation import SIMULATION_DEFAULTS, simulate_portfolio
+from real_estate_store import FLOAT_COLUMNS
+from real_estate_summary import SUMMARY_COLUMNS
+from real_estate_whatif import what_if
+
+# نصوص الواجهة المشتركة بين النسخ العربية والإنجليزية
+TEXTS = {
+    "ar": {
+        "import_header": "📂 استيراد العقارات من ملف",
+        "import_file": "ملف CSV أو Excel أو Parquet",
+        "import_button": "📥 استيراد الملف",
+        "import_progress": "جارٍ الاستيراد... {rows:,} عقار",
+        "import_done": "✅ تم استيراد {rows:,} عقار (تم رفض {rejected:,} صف غير صالح).",
+        "import_error": "🚫 تعذر استيراد الملف: {error}",
+        "paged_view": "📄 عرض الجدول على صفحات",
+        "search": "🔍 بحث في نوع العقار",
+        "filter_types": "تصفية حسب نوع العقار",
+        "sort_by": "ترتيب حسب",
+        "no_sort": "بدون ترتيب",
+        "descending": "ترتيب تنازلي",
+        "page_size": "عدد الصفوف في الصفحة",
+        "page": "الصفحة",
+        "page_info": "الصفحة {page:,} من {pages:,} — {rows:,} عقار مطابق من أصل {total:,}",
+        "export_progress": "جارٍ إنشاء ملف PDF... {rows:,} من {total:,} صف",
+        "export_cancel": "✖️ إلغاء التصدير",
+        "export_cancelled": "تم إلغاء التصدير.",
+        "export_error": "🚫 تعذر إنشاء ملف PDF: {error}",
+        "download_pdf": "📥 تحميل ملف PDF",
+        "amortization_toggle": "📅 عرض جدول السداد لعقار",
+        "property_row": "رقم العقار في الجدول (#)",
+        "no_record": "لا يوجد عقار بالرقم {id}.",
+        "duplicate": "⚠️ هذا العقار موجود بالفعل في الجدول برقم #{id}، لذلك لم تتم إضافته مرة أخرى.",
+        "edit_header": "✏️ تعديل أو حذف عقار",
+        "save_record": "💾 حفظ التعديلات",
+        "delete_record": "🗑️ حذف العقار",
+        "record_saved": "✅ تم حفظ تعديلات العقار #{id}.",
+        "record_deleted": "✅ تم حذف العقار #{id}.",
+        "invalid_down_payment": "🚫 الدفعة المقدمة لا يمكن أن تتجاوز سعر العقار.",
+        "method": "طريقة احتساب الفائدة",
+        "flat": "فائدة ثابتة",
+        "annuity": "رصيد متناقص",
+        "month": "الشهر",
+        "payment": "القسط",
+        "principal": "أصل الدين",
+        "interest": "الفائدة",
+        "balance": "الرصيد المتبقي",
+        "metric_payment": "القسط الشهري",
+        "metric_interest": "إجمالي الفوائد",
+        "sensitivity_toggle": "📈 تحليل الحساسية (الفائدة × المدة)",
+        "grid_metric": "المؤشر",
+        "monthly_payment": "القسط الشهري",
+        "total_interest": "إجمالي الفوائد",
+        "rent_coverage": "تغطية الإيجار للقسط",
+        "interest_rate": "نسبة الفائدة السنوية",
+        "years": "عدد السنوات",
+        "download_csv": "📥 تحميل ملف CSV",
+        "simulation_toggle": "🎲 محاكاة مونت كارلو للفائدة والإيجار",
+        "paths": "عدد المسارات لكل عقار",
+        "rate_volatility": "تذبذب الفائدة السنوي (نقطة مئوية)",
+        "rent_growth": "متوسط نمو الإيجار السنوي (%)",
+        "rent_growth_volatility": "تذبذب نمو الإيجار (%)",
+        "vacancy_rate": "احتمال الشغور السنوي (%)",
+        "seed": "البذرة العشوائية",
+        "run_simulation": "▶️ تشغيل المحاكاة",
+        "simulation_running": "جارٍ تشغيل المحاكاة...",
+        "simulation_total": "متوسط صافي التدفق النقدي للمحفظة",
+        "optimizer_toggle": "🎯 أفضل مجموعة عقارات ضمن الميزانية",
+        "objective": "الهدف",
+        "objective_rent_value": "أعلى إيجار سنوي",
+        "objective_net_rent": "أعلى إيجار سنوي بعد خصم الفائدة السنوية",
+        "max_down_payment": "أقصى مجموع للدفعات المقدمة (فارغ = بلا حد)",
+        "max_monthly_payment": "أقصى مجموع للأقساط الشهرية (فارغ = بلا حد)",
+        "run_optimizer": "▶️ إيجاد أفضل مجموعة",
+        "optimizer_count": "العقارات المختارة",
+        "optimizer_selected": "🎯",
+        "optimizer_objective": "قيمة الهدف السنوية",
+        "optimizer_down_payment": "مجموع الدفعات المقدمة",
+        "optimizer_monthly_payment": "مجموع الأقساط الشهرية",
+        "optimizer_exact": (
+            "✅ الحل الأمثل من بين {candidates:,} عقار ({seconds:.2f} ثانية). العقارات المختارة معلّمة بـ 🎯 في الجدول."
+        ),
+        "optimizer_heuristic": (
+            "أفضل حل خلال المهلة من بين {candidates:,} عقار ({seconds:.2f} ثانية)، ويقل عن الأمثل بما لا يزيد عن "
+            "{gap:.2f}%. العقارات المختارة معلّمة بـ 🎯 في الجدول."
+        ),
+        "affordability_header": "💰 أعلى سعر عقار ممكن لميزانية شهرية",
+        "monthly_budget": "الميزانية الشهرية للقسط",
+        "max_price": "أعلى سعر ممكن",
+        "affordability_file": "ملف ميزانيات المشترين (monthly_budget وdown_payment، والفائدة والمدة اختياريتان)",
+        "affordability_run": "⚙️ حساب الملف",
+        "affordability_progress": "جارٍ الحساب... {rows:,} صف",
+        "affordability_done": "✅ تم حساب {rows:,} صف (تم رفض {rejected:,} صف غير صالح).",
+        "what_if_header": "⚡ معاينة فورية: ماذا لو تغيرت الفائدة أو المدة؟",
+        "what_if_add": "➕ إضافة هذه القيم إلى الجدول",
+        "what_if_added": "✅ تمت إضافة العقار #{id} إلى الجدول.",
+        "total_with_interest": "الإجمالي مع الفوائد",
+        "rent_value": "قيمة الإيجار السنوية",
+        "summary_header": "#### 📊 ملخص المحفظة حسب نوع العقار",
+        "summary_total": "الإجمالي",
+        "summary_property_type": "نوع العقار",
+        "summary_count": "عدد العقارات",
+        "summary_total_financed": "إجمالي التمويل",
+        "summary_total_interest": "إجمالي الفوائد",
+        "summary_average_monthly_payment": "متوسط القسط الشهري",
+        "summary_rent_yield": "العائد الإيجاري (%)",
+        "data_export_header": "📤 تصدير البيانات (CSV أو Excel أو Parquet)",
+        "export_format": "صيغة الملف",
+        "compression": "الضغط",
+        "no_compression": "بدون ضغط",
+        "prepare_export": "⚙️ تجهيز الملف",
+        "download_file": "📥 تحميل الملف",
+        "detail_header": "🗂️ تقرير تفصيلي لكل عقار (PDF)",
+        "detail_format": "شكل التقرير",
+        "detail_pdf": "ملف PDF واحد",
+        "detail_zip": "أرشيف ZIP بملف لكل عقار",
+        "detail_progress": "جارٍ إنشاء صفحات العقارات... {rows:,} من {total:,}",
+        "metrics_toggle": "⏱️ قياس الأداء",
+        "metrics_header": "⏱️ أداء آخر إعادة تشغيل",
+        "metrics_total": "الزمن الكلي",
+        "metrics_records": "عدد العقارات",
+        "metrics_phase": "المرحلة",
+        "metrics_ms": "الزمن (مللي ثانية)",
+        "metrics_memory": "ذاكرة العقارات: {records:,.2f} ميجابايت — الجلسة (تقديري): {session:,.2f} ميجابايت",
+        "metrics_cache": "ذاكرة تقارير PDF: {entries} تقرير، {hits} إصابة، {misses} إخفاق",
+    },
+    "en": {
+        "import_header": "📂 Import Properties from File",
+        "import_file": "CSV, Excel or Parquet file",
+        "import_button": "📥 Import File",
+        "import_progress": "Importing... {rows:,} properties",
+        "import_done": "Imported {rows:,} properties ({rejected:,} invalid rows rejected).",
+        "import_error": "Could not import file: {error}",
+        "paged_view": "📄 Paged table view",
+        "search": "🔍 Search property type",
+        "filter_types": "Filter by property type",
+        "sort_by": "Sort by",
+        "no_sort": "No sorting",
+        "descending": "Descending",
+        "page_size": "Rows per page",
+        "page": "Page",
+        "page_info": "Page {page:,} of {pages:,} — {rows:,} matching of {total:,} properties",
+        "export_progress": "Rendering PDF... {rows:,} of {total:,} rows",
+        "export_cancel": "✖️ Cancel Export",
+        "export_cancelled": "Export cancelled.",
+        "export_error": "Could not create PDF: {error}",
+        "download_pdf": "📥 Download PDF",
+        "amortization_toggle": "📅 Show amortization schedule for a property",
+        "property_row": "Property number in the table (#)",
+        "no_record": "There is no property #{id}.",
+        "duplicate": "This property is already in the table as #{id}, so it was not added again.",
+        "edit_header": "✏️ Edit or delete a property",
+        "save_record": "💾 Save Changes",
+        "delete_record": "🗑️ Delete Property",
+        "record_saved": "Property #{id} updated.",
+        "record_deleted": "Property #{id} deleted.",
+        "invalid_down_payment": "Down payment cannot exceed property price.",
+        "method": "Interest method",
+        "flat": "Flat interest",
+        "annuity": "Reducing balance (annuity)",
+        "month": "Month",
+        "payment": "Payment",
+        "principal": "Principal",
+        "interest": "Interest",
+        "balance": "Balance",
+        "metric_payment": "Monthly Payment",
+        "metric_interest": "Total Interest",
+        "sensitivity_toggle": "📈 Rate × term sensitivity",
+        "grid_metric": "Metric",
+        "monthly_payment": "Monthly Payment",
+        "total_interest": "Total Interest",
+        "rent_coverage": "Rent Coverage of Payment",
+        "interest_rate": "Interest Rate (%)",
+        "years": "Years",
+        "download_csv": "📥 Download CSV",
+        "simulation_toggle": "🎲 Monte Carlo rate and rent simulation",
+        "paths": "Paths per property",
+        "rate_volatility": "Annual rate volatility (pp)",
+        "rent_growth": "Mean annual rent growth (%)",
+        "rent_growth_volatility": "Rent growth volatility (%)",
+        "vacancy_rate": "Annual vacancy probability (%)",
+        "seed": "Random seed",
+        "run_simulation": "▶️ Run Simulation",
+        "simulation_running": "Running simulation...",
+        "simulation_total": "Portfolio mean net cash flow",
+        "optimizer_toggle": "🎯 Best set of properties within a budget",
+        "objective": "Goal",
+        "objective_rent_value": "Highest annual rent",
+        "objective_net_rent": "Highest annual rent minus annual interest",
+        "max_down_payment": "Max total down payment (empty = no limit)",
+        "max_monthly_payment": "Max total monthly payment (empty = no limit)",
+        "run_optimizer": "▶️ Find Best Set",
+        "optimizer_count": "Properties selected",
+        "optimizer_selected": "🎯",
+        "optimizer_objective": "Annual objective value",
+        "optimizer_down_payment": "Total down payment",
+        "optimizer_monthly_payment": "Total monthly payment",
+        "optimizer_exact": (
+            "Optimal set out of {candidates:,} properties ({seconds:.2f}s). "
+            "Selected rows are marked with 🎯 in the table."
+        ),
+        "optimizer_heuristic": (
+            "Best set found within the time limit out of {candidates:,} properties ({seconds:.2f}s), at most "
+            "{gap:.2f}% below the optimum. Selected rows are marked with 🎯 in the table."
+        ),
+        "affordability_header": "💰 Maximum affordable price for a monthly budget",
+        "monthly_budget": "Monthly budget for the payment",
+        "max_price": "Max Affordable Price",
+        "affordability_file": "Buyer budgets file (monthly_budget, down_payment, optional interest_rate and years)",
+        "affordability_run": "⚙️ Calculate File",
+        "affordability_progress": "Calculating... {rows:,} rows",
+        "affordability_done": "Calculated {rows:,} rows ({rejected:,} invalid rows rejected).",
+        "what_if_header": "⚡ Live preview: what if the rate or term changes?",
+        "what_if_add": "➕ Add These Values to the Table",
+        "what_if_added": "Property #{id} added to the table.",
+        "total_with_interest": "Total With Interest",
+        "rent_value": "Annual Rent",
+        "summary_header": "#### 📊 Portfolio Summary by Property Type",
+        "summary_total": "Total",
+        "summary_property_type": "Property Type",
+        "summary_count": "Properties",
+        "summary_total_financed": "Total Financed",
+        "summary_total_interest": "Total Interest",
+        "summary_average_monthly_payment": "Average Monthly Payment",
+        "summary_rent_yield": "Rent Yield (%)",
+        "data_export_header": "📤 Export data (CSV, Excel or Parquet)",
+        "export_format": "File format",
+        "compression": "Compression",
+        "no_compression": "None",
+        "prepare_export": "⚙️ Prepare File",
+        "download_file": "📥 Download File",
+        "detail_header": "🗂️ Detail report per property (PDF)",
+        "detail_format": "Report layout",
+        "detail_pdf": "One merged PDF",
+        "detail_zip": "ZIP with one PDF per property",
+        "detail_progress": "Rendering property pages... {rows:,} of {total:,}",
+        "metrics_toggle": "⏱️ Performance metrics",
+        "metrics_header": "⏱️ Last rerun",
+        "metrics_total": "Total time",
+        "metrics_records": "Properties",
+        "metrics_phase": "Phase",
+        "metrics_ms": "Time (ms)",
+        "metrics_memory": "Records: {records:,.2f} MB — session (estimated): {session:,.2f} MB",
+        "metrics_cache": "PDF report cache: {entries} reports, {hits} hits, {misses} misses",
+    },
+}
+
+_METRICS_OFF = RerunMetrics()
+
+
+def start_metrics():
+    # القياس يعمل عند تفعيل اللوحة الجانبية أو عند تحديد ملف سجل في REAL_ESTATE_METRICS
+    log_path = metrics_log_path()
+    enabled = bool(st.session_state.get("show_metrics")) or log_path is not None
+    rerun = st.session_state.get("metrics_reruns", 0) + 1
+    st.session_state.metrics_reruns = rerun
+    st.session_state.rerun_metrics = RerunMetrics(enabled, log_path, os.path.basename(sys.argv[0]), rerun)
+    return st.session_state.rerun_metrics
+
+
+def rerun_metrics():
+    return st.session_state.get("rerun_metrics", _METRICS_OFF)
+
+
+def timed(name):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with rerun_metrics().phase(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def metrics_panel(lang):
+    # تسجيل قياسات إعادة التشغيل الحالية ثم عرضها في الشريط الجانبي عند الطلب
+    texts = TEXTS[lang]
+    show = st.sidebar.toggle(texts["metrics_toggle"], key="show_metrics")
+    metrics = rerun_metrics()
+    if not metrics.enabled:
+        return
+
+    records = st.session_state.records
+    entry = metrics.finish(
+        records=len(records),
+        record_bytes=records.nbytes,
+        session_bytes=sum(estimate_bytes(value) for key, value in st.session_state.items() if key != "rerun_metrics"),
+        report_cache=report_cache.stats(),
+    )
+    if not show:
+        return
+
+    with st.sidebar:
+        st.subheader(texts["metrics_header"])
+        total_col, records_col = st.columns(2)
+        total_col.metric(texts["metrics_total"], f"{entry['total'] * 1000:,.1f} ms")
+        records_col.metric(texts["metrics_records"], f"{entry['records']:,}")
+        st.dataframe(
+            {
+                texts["metrics_phase"]: list(entry["phases"]),
+                texts["metrics_ms"]: [round(seconds * 1000, 2) for seconds in entry["phases"].values()],
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
+        megabytes = 1024 * 1024
+        st.caption(texts["metrics_memory"].format(
+            records=entry["record_bytes"] / megabytes, session=entry["session_bytes"] / megabytes
+        ))
+        st.caption(texts["metrics_cache"].format(**entry["report_cache"]))
+
+
+@timed("import")
+def import_properties(lang):
+    # استيراد ملف كبير على دفعات مباشرة إلى مخزن السجلات العمودي
+    texts = TEXTS[lang]
+
+    with st.expander(texts["import_header"]):
+        uploaded = st.file_uploader(texts["import_file"], type=SUPPORTED_TYPES)
+        if uploaded is None or not st.button(texts["import_button"]):
+            return
+
+        progress = st.progress(0.0)
+        rows = rejected = 0
+        try:
+            for frame, bad_rows, fraction in import_chunks(uploaded, uploaded.name):
+                st.session_state.records.extend(frame)
+                rows += len(frame)
+                rejected += bad_rows
+                progress.progress(min(fraction, 1.0), text=texts["import_progress"].format(rows=rows))
+        except ValueError as error:
+            st.error(texts["import_error"].format(error=error))
+            return
+        progress.progress(1.0)
+        st.success(texts["import_done"].format(rows=rows, rejected=rejected))
+
+
+EXPORT_FORMATS = {"csv": "CSV", "xlsx": "Excel (XLSX)", "parquet": "Parquet"}
+PAGED_THRESHOLD = 1000
+PAGE_SIZES = [25, 50, 100, 250, 500]
+EXPORT_POLL_SECONDS = 0.5
+
+
+def optimizer_selection():
+    # معرّفات العقارات التي اختارها المحسّن، ما دامت البيانات لم تتغير منذ تشغيله
+    records = st.session_state.records
+    cached = st.session_state.get("optimizer_cache")
+    if cached is None or cached[0][:2] != (id(records), records.version):
+        return None
+    return cached[1]["ids"]
+
+
+def mark_selection(frame, ids, label):
+    # عمود علامة في أول الجدول للعقارات التي اختارها المحسّن؛ الجدول بلا اختيار يبقى كما هو
+    if ids is None or not len(ids):
+        return frame
+    marked = frame.copy(deep=False)
+    marked.insert(0, label, frame.index.isin(ids))
+    return marked
+
+
+def number_columns(names):
+    # تنسيق الأرقام يتم في المتصفح عبر column_config؛ Styler يُعاد حسابه خلية خلية مع كل إرسال للجدول
+    return {name: st.column_config.NumberColumn(format="%.2f") for name in names}
+
+
+def table_columns(labels):
+    return number_columns(labels.get(name, name) for name in FLOAT_COLUMNS)
+
+
+def table_frame(labels, lang):
+    # إعادة استخدام الجدول المعروض بين عمليات إعادة التشغيل حتى تتغير البيانات أو اختيار المحسّن
+    records = st.session_state.records
+    selection = optimizer_selection()
+    key = (id(records), records.version, tuple(labels.values()), lang, id(selection))
+    cached = st.session_state.get("table_frame_cache")
+    if cached is None or cached[0] != key:
+        with rerun_metrics().phase("dataframe"):
+            frame = mark_selection(records.frame(labels), selection, TEXTS[lang]["optimizer_selected"])
+        cached = (key, frame)
+        st.session_state.table_frame_cache = cached
+    return cached[1]
+
+
+def show_table(frame, labels, height=None):
+    # Streamlit يرفض height=None، فلا يُمرر الارتفاع إلا إذا حددته النسخة
+    options = {} if height is None else {"height": height}
+    st.dataframe(frame, column_config=table_columns(labels), use_container_width=True, **options)
+
+
+def paged_table(labels, lang, height=None):
+    # تنسيق وإرسال صفحة واحدة فقط؛ البحث والتصفية والترتيب تتم داخل المخزن
+    texts = TEXTS[lang]
+    records = st.session_state.records
+
+    search_col, filter_col, sort_col, order_col = st.columns(4)
+    search = search_col.text_input(texts["search"])
+    property_types = filter_col.multiselect(texts["filter_types"], records.property_types)
+    sort_by = sort_col.selectbox(
+        texts["sort_by"],
+        [None, *COLUMNS],
+        format_func=lambda name: texts["no_sort"] if name is None else labels[name],
+    )
+    descending = order_col.checkbox(texts["descending"])
+
+    size_col, page_col = st.columns(2)
+    page_size = size_col.selectbox(texts["page_size"], PAGE_SIZES, index=1)
+    page = page_col.number_input(texts["page"], min_value=1, value=1, step=1)
+
+    query = {"sort_by": sort_by, "ascending": not descending, "property_types": property_types, "search": search}
+    metrics = rerun_metrics()
+    with metrics.phase("dataframe"):
+        visible, matches = records.page((page - 1) * page_size, page_size, labels=labels, **query)
+        pages = max(math.ceil(matches / page_size), 1)
+        if page > pages:
+            visible, _ = records.page((pages - 1) * page_size, page_size, labels=labels, **query)
+            page = pages
+    with metrics.phase("styler"):
+        show_table(mark_selection(visible, optimizer_selection(), texts["optimizer_selected"]), labels, height)
+    st.caption(texts["page_info"].format(page=page, pages=pages, rows=matches, total=len(records)))
+
+
+def property_table(labels, lang, height=None):
+    # الجدول الكامل للمحافظ الصغيرة والعرض على صفحات للمحافظ الكبيرة
+    paged = st.toggle(TEXTS[lang]["paged_view"], value=len(st.session_state.records) > PAGED_THRESHOLD)
+    if paged:
+        paged_table(labels, lang, height)
+        return
+    frame = table_frame(labels, lang)
+    # إرسال الأعمدة كما هي مع إعدادات التنسيق: تحويل Arrow بالمللي ثانية بدل حساب Styler لكل خلية
+    with rerun_metrics().phase("styler"):
+        show_table(frame, labels, height)
+
+
+@timed("pdf_export")
+def start_pdf_export(dataframe, settings):
+    # إرسال التصدير إلى مجمع العمال وحفظ المهمة في الجلسة
+    job = st.session_state.get("pdf_job")
+    if job is not None and job.running():
+        job.cancel()
+    st.session_state.pdf_job = submit_export(dataframe, settings)
+
+
+@st.fragment(run_every=EXPORT_POLL_SECONDS)
+def _export_progress(lang):
+    # يعاد تشغيل هذا الجزء وحده لتحديث شريط التقدم دون إيقاف بقية الواجهة
+    texts = TEXTS[lang]
+    job = st.session_state.pdf_job
+    if not job.running():
+        st.rerun()
+    st.progress(job.progress, text=texts["export_progress"].format(rows=job.rows_done, total=job.total))
+    if st.button(texts["export_cancel"]):
+        job.cancel()
+        st.rerun()
+
+
+@timed("pdf_export")
+def pdf_export_status(lang, file_name):
+    # عرض التقدم أثناء التصدير ثم زر التحميل عند اكتمال الملف
+    texts = TEXTS[lang]
+    job = st.session_state.get("pdf_job")
+    if job is None:
+        return
+    if job.running():
+        _export_progress(lang)
+        return
+    if job.cancelled():
+        # زر الإلغاء له الأولوية حتى لو اكتمل الملف في اللحظة نفسها
+        st.info(texts["export_cancelled"])
+        return
+    try:
+        data = job.result()
+    except Exception as error:
+        st.error(texts["export_error"].format(error=error))
+        return
+    if st.session_state.get("pdf_job_timed") is not job:
+        # زمن الإنشاء في الخلفية يُسجل مرة واحدة في أول إعادة تشغيل بعد اكتمال المهمة
+        rerun_metrics().add("pdf_render", job.seconds)
+        st.session_state.pdf_job_timed = job
+    st.download_button(texts["download_pdf"], data, file_name=file_name, mime="application/pdf")
+
+
+@st.fragment
+def what_if_preview(property_types, labels, lang):
+    # جزء مستقل يعاد تشغيله وحده مع كل تغيير، فلا يُعاد رسم الجدول مهما كبرت المحفظة
+    # والنتيجة قراءة من جداول المعاملات المحفوظة (الفائدة × المدة) مضروبة في صافي التمويل
+    texts = TEXTS[lang]
+    with rerun_metrics().phase("what_if"), st.expander(texts["what_if_header"]):
+        message = st.session_state.pop("what_if_message", None)
+        if message:
+            st.success(message)
+
+        type_col, price_col, down_col = st.columns(3)
+        property_type = type_col.selectbox(labels["property_type"], property_types, key="what_if_type")
+        price = price_col.number_input(
+            labels["price"], min_value=10000.0, value=500000.0, step=1000.0, key="what_if_price"
+        )
+        down_payment = down_col.number_input(
+            labels["down_payment"], min_value=0.0, value=100000.0, step=1000.0, key="what_if_down_payment"
+        )
+        rate_col, years_col, rent_col = st.columns(3)
+        interest_rate = rate_col.selectbox(labels["interest_rate"], INTEREST_RATES, index=40, key="what_if_rate")
+        years = years_col.slider(
+            labels["years"], min_value=LOAN_YEARS[0], max_value=LOAN_YEARS[-1], value=20, key="what_if_years"
+        )
+        rental_percent = rent_col.number_input(
+            labels["rental_percent"], min_value=0.0, max_value=100.0, value=5.0, step=0.1, key="what_if_rent"
+        )
+        method = st.radio(
+            texts["method"], METHODS, format_func=texts.get, horizontal=True, key="what_if_method"
+        )
+        if down_payment > price:
+            st.error(texts["invalid_down_payment"])
+            return
+
+        result = what_if(price, down_payment, interest_rate, years, rental_percent, method)
+        payment_col, interest_col, total_col, rent_value_col, coverage_col = st.columns(5)
+        payment_col.metric(texts["metric_payment"], f"{result['monthly_payment']:,.2f}")
+        interest_col.metric(texts["metric_interest"], f"{result['total_interest']:,.2f}")
+        total_col.metric(texts["total_with_interest"], f"{result['total_with_interest']:,.2f}")
+        rent_value_col.metric(texts["rent_value"], f"{result['rent_value']:,.2f}")
+        coverage_col.metric(texts["rent_coverage"], f"{result['rent_coverage']:.2f}")
+
+        inputs = (property_type, price, down_payment, interest_rate, years, rental_percent)
+        if st.button(texts["what_if_add"], key="what_if_add") and not duplicate_warning(lang, *inputs):
+            records = st.session_state.records
+            record_id = records.append(*inputs)
+            st.session_state.what_if_message = texts["what_if_added"].format(id=record_id)
+            # إعادة تشغيل الصفحة كاملة لتحديث الجدول والملخص
+            st.rerun(scope="app")
+
+
+@timed("affordability")
+def affordability_view(labels, lang):
+    # عكس الحاسبة: أعلى سعر لميزانية شهرية ودفعة مقدمة على شبكة (الفائدة × المدة) كاملة، أو لملف مشترين
+    texts = TEXTS[lang]
+    with st.expander(texts["affordability_header"]):
+        budget_col, down_col = st.columns(2)
+        budget = budget_col.number_input(
+            texts["monthly_budget"], min_value=0.0, value=5000.0, step=100.0, key="affordability_budget"
+        )
+        down_payment = down_col.number_input(
+            labels["down_payment"], min_value=0.0, value=100000.0, step=1000.0, key="affordability_down_payment"
+        )
+        method = st.radio(
+            texts["method"], METHODS, format_func=texts.get, horizontal=True, key="affordability_method"
+        )
+        grid = affordability_frame(budget, down_payment, method)
+
+        cells = grid.stack().rename("value").reset_index()
+        chart = alt.Chart(cells).mark_rect().encode(
+            x=alt.X("years:O", title=texts["years"]),
+            y=alt.Y("interest_rate:O", title=texts["interest_rate"], sort="descending"),
+            color=alt.Color("value:Q", title=texts["max_price"]),
+            tooltip=["interest_rate", "years", alt.Tooltip("value:Q", format=",.2f")],
+        )
+        st.altair_chart(chart, use_container_width=True)
+        st.dataframe(grid.style.format(precision=2), use_container_width=True)
+        st.download_button(
+            texts["download_csv"], grid.to_csv().encode("utf-8"), file_name=f"affordability_{method}.csv",
+            mime="text/csv", key="affordability_csv",
+        )
+
+        # ملف مشترين: يُحسب على دفعات ويبقى جاهزًا للتحميل حتى يتغير الملف أو الطريقة
+        uploaded = st.file_uploader(texts["affordability_file"], type=SUPPORTED_TYPES, key="affordability_file")
+        if uploaded is None:
+            return
+        key = (uploaded.file_id, method)
+        cached = st.session_state.get("affordability_cache")
+        if cached is None or cached[0] != key:
+            if not st.button(texts["affordability_run"]):
+                return
+            progress = st.progress(0.0)
+            buffer = io.BytesIO()
+            writer = WRITERS["csv"](buffer)
+            rows = rejected = 0
+            try:
+                for frame, bad_rows, fraction in affordability_chunks(uploaded, uploaded.name, method):
+                    writer.write(frame)
+                    rows += len(frame)
+                    rejected += bad_rows
+                    progress.progress(min(fraction, 1.0), text=texts["affordability_progress"].format(rows=rows))
+            except ValueError as error:
+                st.error(texts["import_error"].format(error=error))
+                return
+            writer.close()
+            progress.empty()
+            cached = (key, buffer.getvalue(), rows, rejected)
+            st.session_state.affordability_cache = cached
+
+        st.success(texts["affordability_done"].format(rows=cached[2], rejected=cached[3]))
+        st.download_button(
+            texts["download_csv"], cached[1], file_name=f"affordability_{method}_buyers.csv", mime="text/csv",
+            key="affordability_batch_csv",
+        )
+
+
+def summary_frame(lang):
+    texts = TEXTS[lang]
+    labels = {name: texts[f"summary_{name}"] for name in SUMMARY_COLUMNS}
+    return st.session_state.records.summary(texts["summary_total"], labels)
+
+
+@timed("summary")
+def portfolio_summary(lang):
+    # الملخص يُقرأ من المجاميع الجارية في المخزن فيبقى فوريًا مهما كبرت المحفظة
+    texts = TEXTS[lang]
+    summary = summary_frame(lang)
+    st.markdown(texts["summary_header"])
+    st.dataframe(summary.style.format(precision=2), hide_index=True, use_container_width=True)
+    st.download_button(
+        texts["download_csv"],
+        summary.to_csv(index=False).encode("utf-8"),
+        file_name="portfolio_summary.csv",
+        mime="text/csv",
+        key="summary_csv",
+    )
+
+
+@timed("data_export")
+def data_export(labels, lang):
+    # كتابة السجلات من المخزن على دفعات إلى ملف في الذاكرة، ويبقى الملف جاهزًا حتى تتغير البيانات
+    texts = TEXTS[lang]
+    records = st.session_state.records
+    with st.expander(texts["data_export_header"]):
+        format_col, compression_col = st.columns(2)
+        fmt = format_col.selectbox(texts["export_format"], list(WRITERS), format_func=EXPORT_FORMATS.get)
+        compression = compression_col.selectbox(
+            texts["compression"], COMPRESSIONS[fmt], format_func=lambda name: name or texts["no_compression"]
+        )
+
+        key = (id(records), records.version, tuple(labels.values()), fmt, compression)
+        cached = st.session_state.get("data_export_cache")
+        if cached is None or cached[0] != key:
+            if not st.button(texts["prepare_export"]):
+                return
+            frames = records.iter_frames(CHUNK_SIZE, labels)
+            cached = (key, export_buffer(frames, fmt, compression, summary_frame(lang)))
+            st.session_state.data_export_cache = cached
+        st.download_button(
+            texts["download_file"],
+            cached[1],
+            file_name=export_file_name("real_estate_records", fmt, compression),
+            mime=MIME_TYPES[fmt],
+        )
+
+
+@timed("detail_reports")
+def detail_reports(labels, lang, settings=DETAIL_REPORT):
+    # صفحة لكل عقار تُرسم في مجمع عمليات وتُكتب تدريجيًا في ملف PDF واحد أو أرشيف ZIP على القرص
+    texts = TEXTS[lang]
+    records = st.session_state.records
+    with st.expander(texts["detail_header"]):
+        format_col, method_col = st.columns(2)
+        fmt = format_col.selectbox(
+            texts["detail_format"], REPORT_FORMATS, format_func=lambda name: texts[f"detail_{name}"]
+        )
+        method = method_col.radio(
+            texts["method"], METHODS, format_func=texts.get, horizontal=True, key="detail_method"
+        )
+
+        key = (id(records), records.version, tuple(labels.values()), fmt, method, tuple(settings.items()))
+        cached = st.session_state.get("detail_reports_cache")
+        if cached is None or cached[0] != key:
+            if not st.button(texts["prepare_export"], key="prepare_detail_reports"):
+                return
+            total = len(records)
+            bar = st.progress(0.0)
+
+            def progress(done):
+                bar.progress(done / total, texts["detail_progress"].format(rows=done, total=total))
+
+            path = spool_path(fmt)
+            try:
+                with open(path, "wb") as output:
+                    write_detail_reports(output, records.iter_frames(CHUNK_SIZE), fmt, labels, settings, method,
+                                         progress=progress)
+            except Exception as error:
+                os.remove(path)
+                st.error(texts["export_error"].format(error=error))
+                return
+            finally:
+                bar.empty()
+            if cached is not None and os.path.exists(cached[1]):
+                os.remove(cached[1])
+            # الجلسة تحفظ مسار الملف فقط؛ البايتات تُقرأ من القرص عند الضغط على زر التحميل
+            cached = (key, path)
+            st.session_state.detail_reports_cache = cached
+        st.download_button(
+            texts["download_file"],
+            functools.partial(_read_file, cached[1]),
+            file_name=f"real_estate_details.{fmt}",
+            mime=REPORT_MIME_TYPES[fmt],
+            key="download_detail_reports",
+        )
+
+
+def _read_file(path):
+    with open(path, "rb") as source:
+        return source.read()
+
+
+def duplicate_warning(lang, property_type, price, down_payment, interest_rate, years, rental_percent):
+    # فحص التكرار عند الإضافة عبر فهرس المدخلات في المخزن، مع تنبيه برقم العقار الموجود
+    record_id = st.session_state.records.find(property_type, price, down_payment, interest_rate, years, rental_percent)
+    if record_id is None:
+        return False
+    st.warning(TEXTS[lang]["duplicate"].format(id=record_id))
+    return True
+
+
+@timed("edit")
+def edit_records(labels, lang):
+    # تعديل عقار واحد أو حذفه بمعرّفه؛ المخزن يحدّث الصف والمجاميع والفهرس فقط
+    texts = TEXTS[lang]
+    records = st.session_state.records
+    with st.expander(texts["edit_header"]):
+        message = st.session_state.pop("edit_message", None)
+        if message:
+            st.success(message)
+
+        record_id = st.number_input(texts["property_row"], min_value=1, value=records.first_id(), step=1, key="edit_id")
+        record = records.record(record_id)
+        if record is None:
+            st.warning(texts["no_record"].format(id=record_id))
+            return
+
+        with st.form(f"edit_record_{record_id}"):
+            type_col, price_col, down_col = st.columns(3)
+            property_type = type_col.selectbox(
+                labels["property_type"],
+                records.property_types,
+                index=records.property_types.index(record["property_type"]),
+            )
+            price = price_col.number_input(labels["price"], min_value=0.0, value=float(record["price"]), step=1000.0)
+            down_payment = down_col.number_input(
+                labels["down_payment"], min_value=0.0, value=float(record["down_payment"]), step=1000.0
+            )
+            rate_col, years_col, rent_col = st.columns(3)
+            interest_rate = rate_col.number_input(
+                labels["interest_rate"], min_value=0.0, value=float(record["interest_rate"]), step=0.1
+            )
+            years = years_col.number_input(labels["years"], min_value=1, value=int(record["years"]), step=1)
+            rental_percent = rent_col.number_input(
+                labels["rental_percent"], min_value=0.0, max_value=100.0, value=float(record["rental_percent"]), step=0.1
+            )
+            save_col, delete_col = st.columns(2)
+            save = save_col.form_submit_button(texts["save_record"])
+            delete = delete_col.form_submit_button(texts["delete_record"])
+
+        if delete:
+            records.delete(record_id)
+            st.session_state.edit_message = texts["record_deleted"].format(id=record_id)
+            st.rerun()
+        if save:
+            if down_payment > price:
+                st.error(texts["invalid_down_payment"])
+                return
+            records.update(record_id, property_type, price, down_payment, interest_rate, years, rental_percent)
+            st.session_state.edit_message = texts["record_saved"].format(id=record_id)
+            st.rerun()
+
+
+@timed("amortization")
+def amortization_view(lang):
+    # جدول السداد يُحسب فقط عند طلبه لعقار واحد، ولا يُخزن لكل العقارات مسبقًا
+    texts = TEXTS[lang]
+    records = st.session_state.records
+    if not st.toggle(texts["amortization_toggle"]):
+        return
+
+    row_col, method_col = st.columns(2)
+    record_id = row_col.number_input(texts["property_row"], min_value=1, value=records.first_id(), step=1)
+    method = method_col.radio(texts["method"], METHODS, format_func=lambda name: texts[name], horizontal=True)
+
+    record = records.record(record_id)
+    if record is None:
+        st.warning(texts["no_record"].format(id=record_id))
+        return
+    labels = {name: texts[name] for name in SCHEDULE_COLUMNS}
+    frame = schedule_frame(record["net_value"], record["interest_rate"], record["years"], method, labels)
+
+    payment_col, interest_col = st.columns(2)
+    payment_col.metric(texts["metric_payment"], f"{frame[texts['payment']].iloc[0]:,.2f}")
+    interest_col.metric(texts["metric_interest"], f"{frame[texts['interest']].sum():,.2f}")
+    st.dataframe(frame.style.format(precision=2), use_container_width=True, hide_index=True)
+
+
+@timed("sensitivity")
+def sensitivity_view(lang):
+    # شبكة الحساسية لعقار واحد: خريطة حرارية وجدول مع التصدير
+    texts = TEXTS[lang]
+    records = st.session_state.records
+    if not st.toggle(texts["sensitivity_toggle"]):
+        return
+
+    row_col, metric_col, method_col = st.columns(3)
+    record_id = row_col.number_input(
+        texts["property_row"], min_value=1, value=records.first_id(), step=1, key="sensitivity_row"
+    )
+    metric = metric_col.selectbox(texts["grid_metric"], METRICS, format_func=texts.get)
+    method = method_col.radio(
+        texts["method"], METHODS, format_func=texts.get, horizontal=True, key="sensitivity_method"
+    )
+
+    record = records.record(record_id)
+    if record is None:
+        st.warning(texts["no_record"].format(id=record_id))
+        return
+    inputs = (float(record["price"]), float(record["down_payment"]), float(record["rental_percent"]), method)
+    grid = sensitivity_frames(*inputs)[metric]
+
+    cells = grid.stack().rename("value").reset_index()
+    chart = alt.Chart(cells).mark_rect().encode(
+        x=alt.X("years:O", title=texts["years"]),
+        y=alt.Y("interest_rate:O", title=texts["interest_rate"], sort="descending"),
+        color=alt.Color("value:Q", title=texts[metric]),
+        tooltip=["interest_rate", "years", alt.Tooltip("value:Q", format=",.2f")],
+    )
+    st.altair_chart(chart, use_container_width=True)
+    st.dataframe(grid.style.format(precision=2), use_container_width=True)
+
+    csv_col, pdf_col = st.columns(2)
+    csv_col.download_button(
+        texts["download_csv"], grid.to_csv().encode("utf-8"), file_name=f"sensitivity_{metric}.csv", mime="text/csv"
+    )
+    pdf_col.download_button(
+        texts["download_pdf"], sensitivity_pdf(*inputs, metric), file_name=f"sensitivity_{metric}.pdf", mime="application/pdf"
+    )
+
+
+@timed("simulation")
+def simulation_view(lang):
+    # محاكاة المحفظة عند الطلب فقط، والنتيجة محفوظة حتى تتغير البيانات أو الإعدادات
+    texts = TEXTS[lang]
+    records = st.session_state.records
+    if not st.toggle(texts["simulation_toggle"]):
+        return
+
+    defaults = SIMULATION_DEFAULTS
+    columns = st.columns(3)
+    params = {
+        "paths": columns[0].number_input(
+            texts["paths"], min_value=100, max_value=100_000, value=defaults["paths"], step=100
+        ),
+        "rate_volatility": columns[1].number_input(
+            texts["rate_volatility"], min_value=0.0, value=defaults["rate_volatility"], step=0.1
+        ),
+        "rent_growth": columns[2].number_input(texts["rent_growth"], value=defaults["rent_growth"], step=0.5),
+        "rent_growth_volatility": columns[0].number_input(
+            texts["rent_growth_volatility"], min_value=0.0, value=defaults["rent_growth_volatility"], step=0.5
+        ),
+        "vacancy_rate": columns[1].number_input(
+            texts["vacancy_rate"], min_value=0.0, max_value=100.0, value=defaults["vacancy_rate"], step=1.0
+        ),
+    }
+    seed = columns[2].number_input(texts["seed"], min_value=0, value=0, step=1)
+
+    key = (id(records), records.version, tuple(params.items()), seed)
+    cached = st.session_state.get("simulation_cache")
+    if st.button(texts["run_simulation"]):
+        with st.spinner(texts["simulation_running"]):
+            cached = (key, simulate_portfolio(records.frame(), params, seed))
+        st.session_state.simulation_cache = cached
+    if cached is None or cached[0] != key:
+        return
+
+    summary = cached[1]
+    st.metric(texts["simulation_total"], f"{summary['net_cash_flow_mean'].sum():,.2f}")
+    # صف لكل عقار، فيُرسل كما هو مثل جدول العقارات بدل Styler
+    st.dataframe(summary, column_config=number_columns(summary.columns), use_container_width=True, height=400)
+
+
+@timed("optimizer")
+def portfolio_optimizer(labels, lang):
+    # اختيار أفضل مجموعة عقارات تحت سقف الدفعات المقدمة والأقساط؛ النتيجة مظللة في الجدول وقابلة للتحميل
+    texts = TEXTS[lang]
+    records = st.session_state.records
+    if not st.toggle(texts["optimizer_toggle"]):
+        return
+
+    objective = st.radio(
+        texts["objective"], OBJECTIVES, format_func=lambda name: texts[f"objective_{name}"], horizontal=True
+    )
+    down_col, monthly_col = st.columns(2)
+    max_down_payment = down_col.number_input(texts["max_down_payment"], min_value=0.0, value=None, step=10000.0)
+    max_monthly_payment = monthly_col.number_input(
+        texts["max_monthly_payment"], min_value=0.0, value=None, step=1000.0
+    )
+
+    key = (id(records), records.version, objective, max_down_payment, max_monthly_payment)
+    cached = st.session_state.get("optimizer_cache")
+    if st.button(texts["run_optimizer"]):
+        result = optimize_portfolio(records.frame(), max_down_payment, max_monthly_payment, objective)
+        st.session_state.optimizer_cache = (key, result)
+        # إعادة التشغيل حتى يظهر التظليل في الجدول المرسوم أعلى الصفحة
+        st.rerun()
+    if cached is None or cached[0] != key:
+        return
+
+    result = cached[1]
+    columns = st.columns(4)
+    columns[0].metric(texts["optimizer_count"], f"{len(result['ids']):,}")
+    columns[1].metric(texts["optimizer_objective"], f"{result['objective']:,.2f}")
+    columns[2].metric(texts["optimizer_down_payment"], f"{result['down_payment']:,.2f}")
+    columns[3].metric(texts["optimizer_monthly_payment"], f"{result['monthly_payment']:,.2f}")
+    if result["optimal"]:
+        st.success(texts["optimizer_exact"].format(**result))
+    else:
+        gap = (result["bound"] - result["objective"]) / result["bound"] * 100 if result["bound"] > 0 else 0.0
+        st.info(texts["optimizer_heuristic"].format(gap=gap, **result))
+
+    selected = records.frame(labels).loc[result["ids"]]
+    st.dataframe(selected, column_config=table_columns(labels), use_container_width=True, height=300)
+    st.download_button(
+        texts["download_csv"],
+        selected.to_csv().encode("utf-8"),
+        file_name=f"optimal_properties_{objective}.csv",
+        mime="text/csv",
+        key="optimizer_csv",
+    )
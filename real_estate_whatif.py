@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+import numpy as np
+
+from real_estate_amortization import monthly_payment
+from real_estate_engine import INTEREST_RATES, LOAN_YEARS
+
+RATE_INDEX = {rate: index for index, rate in enumerate(INTEREST_RATES)}
+
+
+@lru_cache(maxsize=None)
+def factor_tables(method="flat"):
+    # لكل زوج (فائدة، مدة) تسمح به الواجهة (61 × 25): القسط الشهري وإجمالي الفوائد لقرض قيمته 1
+    rates = np.asarray(INTEREST_RATES, dtype=np.float64)[:, None]
+    years = np.asarray(LOAN_YEARS, dtype=np.int64)[None, :]
+    payment = monthly_payment(1.0, rates, years, method)
+    tables = {"monthly_payment": payment, "total_interest": payment * years * 12 - 1.0}
+    for values in tables.values():
+        values.setflags(write=False)
+    return tables
+
+
+def what_if(price, down_payment, interest_rate, years, rental_percent, method="flat"):
+    # نتيجة عقار واحد بقراءة خلية من الجداول وضربها في صافي التمويل
+    cell = RATE_INDEX.get(round(float(interest_rate), 1)), int(years) - 1
+    if cell[0] is None or not 0 <= cell[1] < len(LOAN_YEARS):
+        # قيم خارج نطاق عناصر الواجهة: حساب مباشر
+        payment_factor = float(monthly_payment(1.0, interest_rate, years, method)[0])
+        interest_factor = payment_factor * int(years) * 12 - 1.0
+    else:
+        tables = factor_tables(method)
+        payment_factor = tables["monthly_payment"][cell]
+        interest_factor = tables["total_interest"][cell]
+
+    net_value = price - down_payment
+    payment = net_value * payment_factor
+    rent_value = net_value * rental_percent / 100
+    return {
+        "net_value": net_value,
+        "total_interest": net_value * interest_factor,
+        "total_with_interest": net_value * (1.0 + interest_factor),
+        "monthly_payment": payment,
+        "rent_value": rent_value,
+        "rent_coverage": rent_value / 12 / payment if payment > 0 else float("nan"),
+    }
+
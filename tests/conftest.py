@@ -0,0 +1,6 @@
+import os
+import sys
+
+# الوحدات في جذر المستودع مباشرة، فيُضاف الجذر إلى مسار الاستيراد
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
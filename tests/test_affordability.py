@@ -0,0 +1,37 @@
+import io
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from real_estate_affordability import affordability_chunks
+
+HEADER = "monthly_budget,down_payment,interest_rate,years\n"
+VALID = "2000,50000,5,20\n"
+
+
+def _solve(rows):
+    source = io.BytesIO((HEADER + "".join(rows)).encode("utf-8"))
+    frames, rejected = [], 0
+    for frame, bad_rows, _ in affordability_chunks(source, "budgets.csv"):
+        frames.append(frame)
+        rejected += bad_rows
+    return pd.concat(frames, ignore_index=True), rejected
+
+
+@pytest.mark.parametrize("row", ["2000,50000,5,2.7\n", "2000,50000,5,0.5\n", "2000,50000,-5,20\n"])
+def test_fractional_years_and_negative_rates_are_rejected(row):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        frame, rejected = _solve([VALID, row])
+    assert rejected == 1
+    assert frame["buyer"].tolist() == [1]
+    assert np.isfinite(frame["max_price"]).all()
+
+
+def test_whole_years_written_as_floats_are_kept():
+    frame, rejected = _solve([VALID, "1500,0,0,10.0\n"])
+    assert rejected == 0
+    assert frame["years"].tolist() == [20, 10]
+    assert frame["max_price"].iloc[1] == pytest.approx(1500 * 120)
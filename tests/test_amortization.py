@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from real_estate_amortization import METHODS, monthly_payment, schedule, schedule_frame
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_schedule_frame_covers_a_30_year_term(method):
+    frame = schedule_frame(400000.0, 5.0, 30, method)
+    assert len(frame) == 360
+    assert frame["month"].iloc[-1] == 360
+    assert frame["balance"].iloc[-1] == pytest.approx(0.0, abs=1e-6)
+    assert frame["principal"].sum() == pytest.approx(400000.0)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_schedule_sizes_to_the_longest_loan(method):
+    result = schedule([100000.0, 200000.0], [4.0, 6.0], [10, 40], method)
+    assert result["payment"].shape == (2, 480)
+    # القرض الأقصر ينتهي في شهره الأخير ولا يدفع شيئًا بعده
+    assert np.all(result["payment"][0, 120:] == 0)
+    assert result["payment"][1, -1] == pytest.approx(monthly_payment(200000.0, 6.0, 40, method)[0])
+    assert result["balance"][:, [119, 479]].diagonal() == pytest.approx([0.0, 0.0], abs=1e-6)
@@ -0,0 +1,50 @@
+import zipfile
+
+import pytest
+
+import real_estate_reports
+from real_estate_cli import main
+
+HEADER = "property_type,price,down_payment,interest_rate,years,rental_percent\n"
+ARABIC_ROWS = "شقة,500000,100000,5,20,5\nفيلا,900000,200000,4,25,6\n"
+
+
+@pytest.fixture
+def arabic_input(tmp_path):
+    path = tmp_path / "properties.csv"
+    path.write_text(HEADER + ARABIC_ROWS, encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("report", ["landscape", "portrait", "compact"])
+@pytest.mark.parametrize("labels", ["en", "ar"])
+def test_summary_report_with_arabic_property_types(tmp_path, arabic_input, report, labels):
+    summary = tmp_path / "summary.pdf"
+    assert main([str(arabic_input), "-o", str(summary), "--report", report, "--labels", labels]) == 0
+    assert summary.read_bytes().startswith(b"%PDF")
+
+
+@pytest.mark.parametrize("extension", ["pdf", "zip"])
+def test_detail_reports_with_arabic_property_types(tmp_path, arabic_input, extension):
+    # صفحات التفاصيل تنتقل إلى الخط الموحد تلقائيًا كما في تقرير الخدمة
+    details = tmp_path / f"details.{extension}"
+    assert main([str(arabic_input), "-o", str(tmp_path / "out.csv"), "--details", str(details), "--workers", "1"]) == 0
+    if extension == "zip":
+        with zipfile.ZipFile(details) as archive:
+            assert archive.namelist() == ["property_1.pdf", "property_2.pdf"]
+    else:
+        assert details.read_bytes().startswith(b"%PDF")
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+@pytest.mark.parametrize("extension", ["pdf", "zip"])
+def test_failed_detail_reports_leave_no_file(tmp_path, arabic_input, monkeypatch, extension):
+    def broken(*args, **kwargs):
+        raise RuntimeError("render failed")
+        yield
+
+    monkeypatch.setattr(real_estate_reports, "iter_rendered", broken)
+    details = tmp_path / f"details.{extension}"
+    with pytest.raises(RuntimeError):
+        main([str(arabic_input), "-o", str(tmp_path / "out.csv"), "--details", str(details)])
+    assert not details.exists()
@@ -0,0 +1,23 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from tests.conftest import ROOT
+
+
+def test_detail_report_is_kept_on_disk_not_in_session_state():
+    app = AppTest.from_file(os.path.join(ROOT, "real_estate_calculator_fpdf2.py"), default_timeout=120).run()
+    app.button(key="what_if_add").click().run()
+    app.button(key="prepare_detail_reports").click().run()
+
+    assert not app.exception
+    key, path = app.session_state.detail_reports_cache
+    with open(path, "rb") as report:
+        assert report.read(5) == b"%PDF-"
+
+    # ملف جديد بعد تغيير الإعدادات، والقديم يُحذف من القرص
+    app.radio(key="detail_method").set_value("annuity").run()
+    app.button(key="prepare_detail_reports").click().run()
+    assert not app.exception
+    assert app.session_state.detail_reports_cache[1] != path
+    assert not os.path.exists(path)
@@ -0,0 +1,50 @@
+import io
+
+import pandas as pd
+import pytest
+
+from real_estate_import import import_chunks, normalize_chunk, validate_chunk
+
+HEADER = "property_type,price,down_payment,interest_rate,years,rental_percent\n"
+VALID = "Villa,500000,100000,5,20,5\n"
+
+
+def _import(rows):
+    source = io.BytesIO((HEADER + "".join(rows)).encode("utf-8"))
+    frames, rejected = [], 0
+    for frame, bad_rows, _ in import_chunks(source, "listings.csv"):
+        frames.append(frame)
+        rejected += bad_rows
+    return pd.concat(frames, ignore_index=True), rejected
+
+
+@pytest.mark.parametrize("row", [
+    "Villa,-500000,100000,5,20,5\n",
+    "Villa,500000,-100000,5,20,5\n",
+    "Villa,-500000,-600000,5,20,5\n",
+])
+def test_negative_amounts_are_rejected(row):
+    frame, rejected = _import([VALID, row])
+    assert rejected == 1
+    assert frame["price"].tolist() == [500000.0]
+
+
+@pytest.mark.parametrize("years", ["2.7", "0.5", "20.0001"])
+def test_fractional_years_are_rejected(years):
+    frame, rejected = _import([VALID, f"Villa,500000,100000,5,{years},5\n"])
+    assert rejected == 1
+    assert frame["years"].tolist() == [20]
+
+
+def test_whole_years_written_as_floats_are_kept():
+    frame, rejected = _import([VALID, "House,300000,0,4,10.0,6\n"])
+    assert rejected == 0
+    assert frame["years"].tolist() == [20, 10]
+
+
+def test_existing_rules_still_apply():
+    chunk = normalize_chunk(pd.read_csv(io.StringIO(
+        HEADER + VALID + "Villa,500000,600000,5,20,5\nVilla,500000,100000,5,0,5\nVilla,,100000,5,20,5\n"
+    )))
+    valid, rejected = validate_chunk(chunk)
+    assert (len(valid), rejected) == (1, 3)
@@ -0,0 +1,52 @@
+import os
+import threading
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from real_estate_cache import ReportCache
+from real_estate_jobs import ExportJob
+from real_estate_pdf import LANDSCAPE_REPORT
+from real_estate_ui import TEXTS
+from tests.conftest import ROOT
+
+FRAME = pd.DataFrame({"property_type": ["Villa"] * 3, "price": [1.0, 2.0, 3.0]})
+
+
+def test_cancelled_job_has_no_result():
+    job = ExportJob(FRAME, LANDSCAPE_REPORT, cache=ReportCache())
+    job.future.result()
+    assert not job.cancelled()
+    assert job.result()
+    # الإلغاء بعد اكتمال الملف يبقى نافذًا
+    job.cancel()
+    assert job.cancelled()
+    assert job.result() is None
+
+
+def test_cancel_button_stops_the_export(monkeypatch):
+    # الإلغاء يصل بعد آخر تحديث للتقدم، فيكتمل الملف رغم طلب الإلغاء
+    release = threading.Event()
+
+    def slow_render(dataframe, settings, progress=None):
+        release.wait(30)
+        return b"%PDF-1.3"
+
+    monkeypatch.setattr("real_estate_jobs.render_pdf", slow_render)
+    texts = TEXTS["en"]
+    app = AppTest.from_file(os.path.join(ROOT, "real_estate_calculator_fpdf2.py"), default_timeout=60).run()
+    app.button(key="what_if_add").click().run()
+    [export] = [button for button in app.button if button.label.startswith("📄")]
+    export.click().run()
+    try:
+        [cancel] = [button for button in app.button if button.label == texts["export_cancel"]]
+        cancel.click().run()
+    finally:
+        release.set()
+    app.session_state.pdf_job.future.result()
+    app.run()
+
+    assert not app.exception
+    assert app.session_state.pdf_job.cancelled()
+    assert texts["export_cancelled"] in [message.value for message in app.info]
+    assert texts["download_pdf"] not in [button.label for button in app.get("download_button")]
@@ -0,0 +1,52 @@
+import io
+import re
+import zipfile
+
+import pandas as pd
+import pytest
+
+from real_estate_engine import calculate_frame
+from real_estate_reports import write_detail_reports
+
+
+def _frame(years):
+    inputs = pd.DataFrame({
+        "property_type": ["Apartment"] * len(years),
+        "price": 500000.0,
+        "down_payment": 100000.0,
+        "interest_rate": 5.0,
+        "years": years,
+        "rental_percent": 5.0,
+    })
+    frame = calculate_frame(inputs)
+    frame.index += 1
+    return frame
+
+
+@pytest.mark.parametrize("method", ["flat", "annuity"])
+def test_detail_report_for_30_year_loan(method):
+    # الجدول السنوي كان مقصوصًا عند 25 سنة فيفشل التقرير كله بـ IndexError
+    buffer = io.BytesIO()
+    assert write_detail_reports(buffer, [_frame([30, 10])], "pdf", method=method, workers=1) == 2
+    data = buffer.getvalue()
+    assert data.startswith(b"%PDF") and data.rstrip().endswith(b"%%EOF")
+
+    fitz = pytest.importorskip("fitz")
+    document = fitz.open(stream=data, filetype="pdf")
+    text = "\n".join(page.get_text() for page in document)
+    assert re.search(r"^30$", text, re.M)
+    assert "Property #2" in text
+
+
+def test_detail_report_zip_for_40_year_loan():
+    buffer = io.BytesIO()
+    assert write_detail_reports(buffer, [_frame([40])], "zip", workers=1) == 1
+    with zipfile.ZipFile(buffer) as archive:
+        assert archive.namelist() == ["property_1.pdf"]
+        data = archive.read("property_1.pdf")
+
+    fitz = pytest.importorskip("fitz")
+    document = fitz.open(stream=data, filetype="pdf")
+    # الجدول يكمل في صفحة ثانية بدل الخروج عن حدود الصفحة
+    assert document.page_count == 2
+    assert re.search(r"^40$", document[1].get_text(), re.M)
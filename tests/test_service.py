@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+
+from real_estate_service import CalculationService, RequestError, parse_property
+
+PROPERTY = {"property_type": "Villa", "price": 500000, "down_payment": 100000, "interest_rate": 5, "years": 20}
+
+
+async def _request(port, method, path, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    return status, head, payload
+
+
+def _call(*requests):
+    # تشغيل الخدمة على منفذ عشوائي وإرسال الطلبات بالترتيب
+    async def run():
+        service = CalculationService()
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return [await _request(port, *request) for request in requests]
+        finally:
+            server.close()
+            await service.close()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("field, value", [
+    ("price", "NaN"), ("down_payment", "Infinity"), ("interest_rate", "-Infinity"), ("rental_percent", "NaN"),
+])
+def test_non_finite_values_are_rejected(field, value):
+    body = json.dumps(PROPERTY)[:-1] + f', "{field}": {value}}}'
+    [(status, _, payload)] = _call(("POST", "/calculate", body.encode()))
+    assert status == 400
+    assert field in json.loads(payload)["error"]
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("years", 2.7, "whole number"),
+    ("years", True, "must be a number"),
+    ("price", -500000, "negative"),
+    ("down_payment", -600000, "negative"),
+    ("interest_rate", -5, "negative"),
+    ("rental_percent", -3, "negative"),
+])
+def test_invalid_amounts_and_years_are_rejected(field, value, message):
+    # نفس قواعد استيراد الملفات: لا مبالغ سالبة ولا مدد كسرية
+    body = json.dumps({**PROPERTY, field: value}).encode()
+    [(status, _, payload)] = _call(("POST", "/calculate", body))
+    assert status == 400
+    assert field in json.loads(payload)["error"]
+    assert message in json.loads(payload)["error"]
+
+
+def test_whole_float_years_are_accepted():
+    assert parse_property({**PROPERTY, "years": 20.0})["years"] == 20
+
+
+def test_huge_years_is_a_bad_request():
+    body = json.dumps(PROPERTY).replace('"years": 20', '"years": 1e400').encode()
+    [(status, _, payload)] = _call(("POST", "/calculate/batch", b"[" + body + b"]"))
+    assert status == 400
+    assert "Invalid value" in json.loads(payload)["error"]
+
+
+def test_unexpected_error_returns_json_500(monkeypatch):
+    def broken(rows):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("real_estate_service.price_rows", broken)
+    body = json.dumps(PROPERTY).encode()
+    results = _call(("POST", "/calculate/batch", b"[" + body + b"]"), ("POST", "/calculate", body))
+    for status, _, payload in results:
+        assert status == 500
+        assert json.loads(payload) == {"error": "Internal error: boom"}
+
+
+@pytest.mark.parametrize("layout", ["", "?layout=portrait", "?layout=arabic"])
+def test_report_with_arabic_property_types(layout):
+    items = [{**PROPERTY, "property_type": name} for name in ["شقة", "فيلا", "Villa"]]
+    [(status, head, payload)] = _call(("POST", f"/report{layout}", json.dumps(items).encode()))
+    assert status == 200
+    assert b"application/pdf" in head
+    assert payload.startswith(b"%PDF")
+
+
+def test_parse_property_accepts_finite_values():
+    assert parse_property(PROPERTY)["years"] == 20
+    with pytest.raises(RequestError):
+        parse_property({**PROPERTY, "price": float("nan")})
@@ -0,0 +1,89 @@
+import threading
+
+import numpy as np
+import pytest
+
+from real_estate_engine import LABELS_EN
+from real_estate_store import RecordStore
+
+PROPERTY_TYPES = ["Apartment", "House", "Villa"]
+ROWS = [
+    ("Apartment", 500000.0, 100000.0, 5.0, 20, 5.0),
+    ("House", 300000.0, 50000.0, 4.0, 10, 6.0),
+    ("Villa", 900000.0, 200000.0, 6.0, 25, 4.0),
+]
+
+
+@pytest.fixture
+def records():
+    store = RecordStore(PROPERTY_TYPES)
+    for row in ROWS:
+        store.append(*row)
+    return store
+
+
+@pytest.mark.parametrize("change", [
+    lambda store: store.delete(1),
+    lambda store: store.update(2, "Villa", 1.0, 0.0, 1.0, 1, 1.0),
+    lambda store: (store.clear(), store.append("House", 1.0, 0.0, 1.0, 1, 1.0)),
+])
+def test_edits_write_in_place_without_copying(records, change):
+    # التعديل والحذف بتكلفة ثابتة: لا نسخ للأعمدة حتى بعد تسليم عرض منها
+    frame = records.frame()
+    arrays = [records._type_codes, records._years, records._ids, *records._floats.values()]
+    change(records)
+    assert [records._type_codes, records._years, records._ids, *records._floats.values()] == arrays
+    assert records.frame() is not frame
+
+
+def test_frames_are_read_only_views(records):
+    frame = records.frame(LABELS_EN)
+    with pytest.raises(ValueError):
+        frame[LABELS_EN["price"]].to_numpy()[0] = 1.0
+    with pytest.raises(ValueError):
+        frame.loc[1, LABELS_EN["price"]] = 1.0
+    # المخزن نفسه يبقى قابلًا للكتابة
+    records.update(1, "Villa", 1.0, 0.0, 1.0, 1, 1.0)
+    assert records.record(1)["price"] == 1.0
+
+
+def test_background_export_keeps_its_copy(records, monkeypatch):
+    # من يحتفظ بالإطار بعد الكتابة التالية ينسخه، مثل مهمة تصدير PDF التي تُرسم بعد تعديل المحفظة
+    import real_estate_jobs
+    from real_estate_cache import ReportCache
+    from real_estate_pdf import LANDSCAPE_REPORT
+
+    release = threading.Event()
+    rendered = []
+
+    def render(dataframe, settings, progress=None):
+        release.wait(30)
+        rendered.append(dataframe.copy(deep=True))
+        return b"%PDF"
+
+    monkeypatch.setattr(real_estate_jobs, "render_pdf", render)
+    expected = records.frame().copy(deep=True)
+    job = real_estate_jobs.ExportJob(records.frame(), LANDSCAPE_REPORT, cache=ReportCache())
+    records.delete(1)
+    records.update(2, "Villa", 1.0, 0.0, 1.0, 1, 1.0)
+    release.set()
+    assert job.result() == b"%PDF"
+    assert rendered[0].equals(expected)
+
+
+def test_new_frames_see_the_change(records):
+    records.frame()
+    records.delete(1)
+    records.update(2, "Villa", 400000.0, 0.0, 5.0, 10, 5.0)
+    frame = records.frame()
+    assert frame.index.tolist() == [3, 2]
+    assert frame.loc[2, "price"] == 400000.0
+    assert records.record(2)["property_type"] == "Villa"
+
+
+def test_frame_is_still_zero_copy_until_a_change(records):
+    frame = records.frame()
+    assert np.shares_memory(frame["price"].to_numpy(), records.column("price"))
+    records.append("House", 1.0, 0.0, 1.0, 1, 1.0)
+    # الإضافة تكتب بعد آخر صف ظاهر، فلا نسخ
+    assert np.shares_memory(frame["price"].to_numpy(), records.column("price"))
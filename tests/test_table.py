@@ -0,0 +1,69 @@
+import json
+import os
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from real_estate_engine import LABELS_EN_SHORT
+from real_estate_simulation import SUMMARY_COLUMNS
+from real_estate_store import FLOAT_COLUMNS
+from real_estate_ui import TEXTS, mark_selection, table_columns
+from tests.conftest import ROOT
+
+
+def test_mark_selection_adds_a_leading_column_without_touching_the_frame():
+    frame = pd.DataFrame({"price": [1.0, 2.0, 3.0]}, index=pd.Index([1, 2, 3], name="#"))
+    assert mark_selection(frame, None, "🎯") is frame
+    marked = mark_selection(frame, [2, 3], "🎯")
+    assert list(marked.columns) == ["🎯", "price"]
+    assert marked["🎯"].tolist() == [False, True, True]
+    assert list(frame.columns) == ["price"]
+
+
+def test_table_columns_format_every_float_column():
+    config = table_columns(LABELS_EN_SHORT)
+    assert set(config) == {LABELS_EN_SHORT[name] for name in FLOAT_COLUMNS}
+    assert all(column["type_config"]["format"] == "%.2f" for column in config.values())
+
+
+def test_property_table_sends_a_plain_frame_with_the_optimizer_marks():
+    texts = TEXTS["en"]
+    app = AppTest.from_file(os.path.join(ROOT, "real_estate_calculator_fpdf2.py"), default_timeout=60).run()
+    app.button(key="what_if_add").click().run()
+    [toggle] = [toggle for toggle in app.toggle if toggle.label == texts["optimizer_toggle"]]
+    toggle.set_value(True).run()
+    [button] = [button for button in app.button if button.label == texts["run_optimizer"]]
+    button.click().run()
+
+    assert not app.exception
+    # الجدول الوحيد الذي يحمل عمود العلامة هو جدول العقارات؛ جدول المحسّن نفسه يبقى بلا علامة
+    [table] = [element.value for element in app.dataframe if texts["optimizer_selected"] in element.value.columns]
+    assert table.columns[0] == texts["optimizer_selected"]
+    assert table[texts["optimizer_selected"]].tolist() == [True]
+    assert table[LABELS_EN_SHORT["price"]].dtype == "float64"
+
+
+def test_paged_view_runs_in_variants_without_a_table_height():
+    texts = TEXTS["ar"]
+    app = AppTest.from_file(os.path.join(ROOT, "real_estate_calculator_multi.py"), default_timeout=60).run()
+    app.button(key="what_if_add").click().run()
+    [toggle] = [toggle for toggle in app.toggle if toggle.label == texts["paged_view"]]
+    toggle.set_value(True).run()
+
+    assert not app.exception
+    assert texts["page_info"].format(page=1, pages=1, rows=1, total=1) in [caption.value for caption in app.caption]
+
+
+def test_simulation_summary_is_formatted_with_column_config():
+    texts = TEXTS["en"]
+    app = AppTest.from_file(os.path.join(ROOT, "real_estate_calculator_fpdf2.py"), default_timeout=60).run()
+    app.button(key="what_if_add").click().run()
+    [toggle] = [toggle for toggle in app.toggle if toggle.label == texts["simulation_toggle"]]
+    toggle.set_value(True).run()
+    [button] = [button for button in app.button if button.label == texts["run_simulation"]]
+    button.click().run()
+
+    assert not app.exception
+    [table] = [element for element in app.dataframe if list(element.value.columns) == SUMMARY_COLUMNS]
+    config = json.loads(table.proto.columns)
+    assert all(config[name]["type_config"]["format"] == "%.2f" for name in SUMMARY_COLUMNS)
@@ -0,0 +1,37 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from real_estate_sqlite import SQLiteRecordStore
+from real_estate_store import DATABASE_ENV, RecordStore
+from tests.conftest import ROOT
+
+PROPERTY_TYPES = ["Apartment", "House", "Villa"]
+INPUTS = ("Apartment", 500000.0, 100000.0, 5.0, 20, 5.0)
+
+
+@pytest.mark.parametrize("store", ["memory", "sqlite"])
+def test_append_returns_new_id(store, tmp_path):
+    records = RecordStore(PROPERTY_TYPES) if store == "memory" else SQLiteRecordStore(
+        str(tmp_path / "records.db"), PROPERTY_TYPES
+    )
+    first = records.append(*INPUTS)
+    second = records.append("House", 300000.0, 50000.0, 4.0, 10, 6.0)
+    assert (first, second) == (1, 2)
+    assert records.record(second)["property_type"] == "House"
+
+
+def test_what_if_add_with_sqlite_store(tmp_path, monkeypatch):
+    monkeypatch.setenv(DATABASE_ENV, str(tmp_path / "records.db"))
+    app = AppTest.from_file(os.path.join(ROOT, "real_estate_calculator_fpdf2.py"), default_timeout=60).run()
+    app.button(key="what_if_add").click().run()
+
+    assert not app.exception
+    assert [message.value for message in app.success] == ["Property #1 added to the table."]
+    assert len(app.session_state.records) == 1
+
+    # إعادة الضغط تكشف التكرار بدل إضافة صف ثانٍ
+    app.button(key="what_if_add").click().run()
+    assert not app.exception
+    assert len(app.session_state.records) == 1